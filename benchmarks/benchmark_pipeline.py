@@ -0,0 +1,438 @@
+# Benchmarks of the documentation building pipeline on synthetic projects and pages shaped like ivy's
+# Everything is generated in a temporary folder and neither ivy nor any framework is imported, so this runs offline
+# Usage: python3 benchmarks/benchmark_pipeline.py [--submodules 4 8 16] [--page_sizes 50 100 200] [--output report.json]
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+DOCS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "docs"
+)
+SUBMODULE_NAMES = [
+    "activations",
+    "creation",
+    "data_type",
+    "device",
+    "elementwise",
+    "general",
+    "gradients",
+    "layers",
+    "linear_algebra",
+    "losses",
+    "manipulation",
+    "norms",
+    "random",
+    "searching",
+    "set",
+    "sorting",
+    "statistical",
+    "utility",
+]
+
+# Modules of the ivy namespace which are never imported, so that no framework can be loaded by a benchmark
+FORBIDDEN_MODULES = ["ivy", "jax", "numpy", "tensorflow", "torch"]
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def get_submodule_names(num_submodules):
+    # The names of ivy's submodules, numbered once there are more submodules than names
+    return [
+        SUBMODULE_NAMES[i % len(SUBMODULE_NAMES)]
+        + ("" if i < len(SUBMODULE_NAMES) else str(i // len(SUBMODULE_NAMES)))
+        for i in range(num_submodules)
+    ]
+
+
+def create_function(name, indent=""):
+    return (
+        "{0}def {1}(\n{0}    x: Union[ivy.Array, ivy.NativeArray],\n{0}    /,\n{0}    *,\n"
+        "{0}    out: Optional[ivy.Array] = None,\n{0}) -> ivy.Array:\n"
+        '{0}    """Computes {1} of x.\n\n{0}    Parameters\n{0}    ----------\n{0}    x\n'
+        "{0}        input array.\n{0}    out\n{0}        optional output array.\n\n"
+        "{0}    Returns\n{0}    -------\n{0}    ret\n{0}        the result of ivy.{1}.\n\n"
+        '{0}    """\n{0}    return x\n\n\n'
+    ).format(indent, name)
+
+
+def create_project(project_dir, num_submodules, num_functions, num_methods, readmes):
+    """Write a project shaped like ivy with its docs folder, returning the docs folder.
+
+    Every submodule has num_functions functions in functional/ivy and num_methods of them are instance methods of
+    the array and the container, the container ones with their static variants. The first readmes folders of the
+    project have a README.rst.
+    """
+    root_dir = os.path.join(project_dir, "ivy")
+    submodules = get_submodule_names(num_submodules)
+    header = "import abc\nimport ivy\nfrom typing import Union, Optional\n\n\n"
+    write_file(os.path.join(root_dir, "__init__.py"), "")
+    write_file(
+        os.path.join(root_dir, "func_wrapper.py"),
+        header + create_function("to_native_arrays_and_back"),
+    )
+    folders = ["functional", "functional/ivy", "array", "container", "stateful"]
+    for index, folder in enumerate(folders):
+        write_file(os.path.join(root_dir, folder, "__init__.py"), "")
+        if index < readmes:
+            title = folder.split("/")[-1].capitalize()
+            write_file(
+                os.path.join(root_dir, folder, "README.rst"),
+                "{}\n{}\n\nThe {} of ivy.\n".format(title, "=" * len(title), folder),
+            )
+    for submodule in submodules:
+        function_names = ["{}_fn{}".format(submodule, i) for i in range(num_functions)]
+        write_file(
+            os.path.join(root_dir, "functional", "ivy", submodule + ".py"),
+            '"""Collection of {} functions."""\n\n'.format(submodule)
+            + header
+            + "".join(create_function(name) for name in function_names),
+        )
+        for backend in ["jax", "numpy", "tensorflow", "torch"]:
+            write_file(
+                os.path.join(
+                    root_dir, "functional", "backends", backend, submodule + ".py"
+                ),
+                header + create_function(function_names[0]),
+            )
+        class_name = "".join(part.capitalize() for part in submodule.split("_"))
+        write_file(
+            os.path.join(root_dir, "array", submodule + ".py"),
+            header
+            + "class ArrayWith{}(abc.ABC):\n".format(class_name)
+            + "".join(
+                create_function(name, "    ") for name in function_names[:num_methods]
+            ),
+        )
+        write_file(
+            os.path.join(root_dir, "container", submodule + ".py"),
+            header
+            + "class ContainerWith{}(ContainerBase):\n".format(class_name)
+            + "".join(
+                "    @staticmethod\n"
+                + create_function("static_" + name, "    ")
+                + create_function(name, "    ")
+                for name in function_names[:num_methods]
+            ),
+        )
+    class_names = [
+        "".join(part.capitalize() for part in s.split("_")) for s in submodules
+    ]
+    write_file(
+        os.path.join(root_dir, "array", "array.py"),
+        "class Array(\n"
+        + "".join("    ArrayWith{},\n".format(c) for c in class_names)
+        + "):\n"
+        "    def __init__(self, data):\n        self._data = data\n",
+    )
+    write_file(
+        os.path.join(root_dir, "container", "container.py"),
+        "class Container(\n"
+        + "".join("    ContainerWith{},\n".format(c) for c in class_names)
+        + "):\n"
+        "    def __init__(self, dict_in=None):\n        pass\n",
+    )
+    write_file(
+        os.path.join(root_dir, "container", "base.py"),
+        "class ContainerBase(dict):\n    pass\n",
+    )
+    for folder in ["array", "container"]:
+        write_file(
+            os.path.join(root_dir, folder, "wrapping.py"),
+            "def _wrap_function(fn):\n    return fn\n",
+        )
+    write_file(
+        os.path.join(root_dir, "stateful", "layers.py"),
+        "class Module:\n    pass\n\n\nclass Linear(Module):\n    def __init__(self):\n        pass\n",
+    )
+    write_file(
+        os.path.join(project_dir, "README.rst"),
+        "Ivy\n===\n\nCheck out the docs_ for more info!\n",
+    )
+
+    # The docs folder of the project, with the files of the doc-builder and the ones ivy provides
+    docs_dir = os.path.join(project_dir, "docs")
+    shutil.copytree(
+        DOCS_DIR,
+        docs_dir,
+        ignore=shutil.ignore_patterns(
+            "__pycache__", "build", "autogenerated_source", ".*"
+        ),
+    )
+    write_file(
+        os.path.join(docs_dir, "partial_source", "index_prepend.rst"),
+        ".. title:: Ivy\n",
+    )
+    write_file(
+        os.path.join(docs_dir, "partial_source", "discussion_links.json"),
+        json.dumps({"functional/ivy": {s: ["1", "2"] for s in submodules}}),
+    )
+    write_file(
+        os.path.join(docs_dir, "submods_to_skip.txt"),
+        "submods to skip\nfunctional/backends\n",
+    )
+    write_file(
+        os.path.join(docs_dir, "submods_to_step.txt"),
+        "submods to step\nfunctional/ivy\n",
+    )
+    write_file(os.path.join(docs_dir, "submod_orders.txt"), "submod orders\n")
+    return docs_dir
+
+
+def run_generation(docs_dir):
+    # Runs in a new interpreter, as the generation keeps its state in module level variables
+    os.chdir(docs_dir)
+    sys.path.insert(0, docs_dir)
+    import supported_devices
+    import generate_src_rst_files
+
+    # The device support flags would import ivy and the frameworks
+    supported_devices.PROBE_ON_MISS = False
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start_time = time.perf_counter()
+        generate_src_rst_files.main("../ivy", None)
+        elapsed = time.perf_counter() - start_time
+    imported = [name for name in FORBIDDEN_MODULES if name in sys.modules]
+    if imported:
+        raise RuntimeError("The generation imported {}".format(", ".join(imported)))
+    num_files = sum(len(files) for _, _, files in os.walk("autogenerated_source"))
+    return elapsed, num_files
+
+
+def create_page(num_definitions, docstring_words):
+    """Markup shaped like a page sphinx writes for a submodule of ivy's functional api."""
+    definition = (
+        '<dt class="sig sig-object py" id="ivy.functional.ivy.general.fn{0}">\n'
+        '<span class="sig-prename descclassname"><span class="pre">ivy.functional.ivy.general.</span></span>'
+        '<span class="sig-name descname"><span class="pre">fn{0}</span></span>'
+        '<a class="reference internal" href="../../_modules/ivy/functional/ivy/general.html#fn{0}">'
+        '<span class="viewcode-link"><span class="pre">[source]</span></span></a></dt>\n'
+        "<dd><p>Computes fn{0} of x, the variant of ivy.fn{1} for arrays. {2}</p>\n"
+        '<dl class="field-list simple">\n<dt class="field-odd">Parameters</dt>\n'
+        '<dd class="field-odd"><ul class="simple"><li><p><strong>x</strong> '
+        '(<code class="xref py py-class docutils literal notranslate"><span class="pre">Union</span></code>'
+        '[<a class="reference internal" href="#ivy.Array"><code class="xref py py-class docutils literal '
+        'notranslate"><span class="pre">Tensor</span></code></a>]) – input array close to 3.141592653589793.'
+        "</p></li></ul></dd></dl>\n"
+        '<p>See <a class="reference external" href="../../docs/ivy_mech.html">mech</a> # noqa</p>\n'
+        "</dd>\n"
+    )
+    words = " ".join("lorem" for _ in range(docstring_words))
+    return (
+        '<html>\n<head>\n    <link rel="stylesheet" href="_static/css/theme.css" type="text/css" />\n'
+        "</head>\n<body>\n"
+        '<div role="navigation" aria-label="breadcrumbs navigation"><ul class="wy-breadcrumbs">'
+        '<li><a href="index.html">Docs</a></li><li>&lt;no title&gt;</li></ul></div>\n'
+        '<div class="line"><strong>Supported Frameworks:</strong></div>\n<p>'
+        + "".join(
+            '<a class="reference external" href="https://{0}.org">{0}</a>'.format(
+                framework
+            )
+            for framework in ["jax", "tensorflow", "pytorch", "numpy"]
+        )
+        + "</p>\n<dl>\n"
+        + "".join(
+            definition.format(i, (i + 1) % num_definitions, words)
+            for i in range(num_definitions)
+        )
+        + "</dl>\n</body>\n</html>\n"
+    )
+
+
+def time_page_corrections(work_dir, page_sizes, docstring_words, repeats):
+    sys.path.insert(0, DOCS_DIR)
+    import correct_built_html_files
+
+    with open(os.path.join(DOCS_DIR, "ivy_modules.txt"), "r") as f:
+        module_names = [line.strip() for line in f if line.strip()]
+    context = correct_built_html_files.RewriteContext(
+        module_names,
+        {
+            "ivy.functional.ivy.": "ivy.",
+            "ivy.array.": "ivy.Array.",
+            "ivy.container.": "ivy.Container.",
+        },
+    )
+    html_filepath = os.path.join(work_dir, "build", "functional", "ivy", "general.html")
+    results = []
+    for num_definitions in page_sizes:
+        page = create_page(num_definitions, docstring_words)
+        times = []
+        for _ in range(repeats):
+            write_file(html_filepath, page)
+            start_time = time.perf_counter()
+            correct_built_html_files.modify_html_file(html_filepath, context)
+            times.append(time.perf_counter() - start_time)
+        results.append(
+            {
+                "definitions": num_definitions,
+                "bytes": len(page.encode()),
+                "seconds": min(times),
+            }
+        )
+    return results
+
+
+def time_generations(
+    work_dir, submodule_counts, num_functions, num_methods, readmes, repeats
+):
+    results = []
+    for num_submodules in submodule_counts:
+        project_dir = os.path.join(work_dir, "project_{}".format(num_submodules))
+        docs_dir = create_project(
+            project_dir, num_submodules, num_functions, num_methods, readmes
+        )
+        times = []
+        for _ in range(repeats):
+            shutil.rmtree(
+                os.path.join(docs_dir, "autogenerated_source"), ignore_errors=True
+            )
+            shutil.rmtree(os.path.join(docs_dir, "build"), ignore_errors=True)
+            with ProcessPoolExecutor(
+                1, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                elapsed, num_files = executor.submit(run_generation, docs_dir).result()
+            times.append(elapsed)
+        results.append(
+            {
+                "submodules": num_submodules,
+                "functions": num_submodules * num_functions,
+                "files": num_files,
+                "seconds": min(times),
+            }
+        )
+        shutil.rmtree(project_dir)
+    return results
+
+
+def get_scaling_exponent(sizes, seconds):
+    # Slope of the least squares line through log(seconds) over log(size), 1 for linear scaling
+    if len(sizes) < 2:
+        return None
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(value, 1e-9)) for value in seconds]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+def print_curve(title, results, size_key, unit):
+    print("\n" + title)
+    print("{:>12}{:>12}{:>18}".format(size_key, "seconds", "ms per " + unit))
+    for result in results:
+        print(
+            "{:>12}{:>12.4f}{:>18.4f}".format(
+                result[size_key],
+                result["seconds"],
+                1000 * result["seconds"] / result[size_key],
+            )
+        )
+    exponent = get_scaling_exponent(
+        [result[size_key] for result in results],
+        [result["seconds"] for result in results],
+    )
+    if exponent is not None:
+        print("time grows with {} to the power of {:.2f}".format(size_key, exponent))
+    return exponent
+
+
+def main(args):
+    report = dict(arguments=vars(args))
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.submodules:
+            generations = time_generations(
+                work_dir,
+                args.submodules,
+                args.functions,
+                args.methods,
+                args.readmes,
+                args.repeats,
+            )
+            exponent = print_curve(
+                "generate_src_rst_files.main", generations, "functions", "function"
+            )
+            report["generation"] = {
+                "results": generations,
+                "scaling_exponent": exponent,
+            }
+        if args.page_sizes:
+            corrections = time_page_corrections(
+                work_dir, args.page_sizes, args.docstring_words, args.repeats
+            )
+            exponent = print_curve(
+                "correct_built_html_files.modify_html_file",
+                corrections,
+                "definitions",
+                "definition",
+            )
+            report["page_correction"] = {
+                "results": corrections,
+                "scaling_exponent": exponent,
+            }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--submodules",
+        type=int,
+        nargs="*",
+        default=[2, 4, 8, 16],
+        help="Numbers of submodules of the synthetic projects, one generation is timed for each.",
+    )
+    parser.add_argument(
+        "--functions", type=int, default=20, help="Functions per submodule."
+    )
+    parser.add_argument(
+        "--methods",
+        type=int,
+        default=15,
+        help="Functions per submodule which are array and container methods as well.",
+    )
+    parser.add_argument(
+        "--readmes",
+        type=int,
+        default=0,
+        help="Folders of the synthetic projects with a README.rst, of functional, functional/ivy, array, "
+        "container and stateful.",
+    )
+    parser.add_argument(
+        "--page_sizes",
+        type=int,
+        nargs="*",
+        default=[25, 50, 100, 200, 400],
+        help="Numbers of function definitions of the synthetic pages, one correction is timed for each.",
+    )
+    parser.add_argument(
+        "--docstring_words",
+        type=int,
+        default=100,
+        help="Words in the docstring of every definition.",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Every size is timed this many times, the fastest time is reported.",
+    )
+    parser.add_argument(
+        "--output", type=str, help="JSON file the results are written to."
+    )
+    main(parser.parse_args())
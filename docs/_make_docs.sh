@@ -1,16 +1,187 @@
 #!/bin/bash
 # file with commands to generate documentation, _ indicates a privately accessed file
 
-# delete any previously generated content
-rm -rf autogenerated_source
+# options used by this file, all other arguments are passed on to generate_src_rst_files.py
+jobs=1
+incremental=false
+cache_dir=""
+precompute_support_matrix=false
+only=()
+stats=""
+asset_store=""
+precompress=false
+profile_args=()
+args=()
+while [[ $# -gt 0 ]]
+do
+    case "$1" in
+        --jobs)
+            jobs="$2"
+            shift 2
+            ;;
+        --incremental)
+            incremental=true
+            shift
+            ;;
+        --cache_dir)
+            cache_dir="$2"
+            shift 2
+            ;;
+        --precompute_support_matrix)
+            precompute_support_matrix=true
+            shift
+            ;;
+        --stats)
+            stats="$2"
+            shift 2
+            ;;
+        --precompress)
+            precompress=true
+            shift
+            ;;
+        --asset_store)
+            asset_store="$2"
+            shift 2
+            ;;
+        --profile|--profile_output)
+            # profiling of the corrections of the pages, see correct_built_html_files.py
+            profile_args+=("$1" "$2")
+            shift 2
+            ;;
+        --only)
+            # the folders, modules and name patterns given after --only, up to the next option
+            shift
+            while [[ $# -gt 0 && "$1" != --* ]]
+            do
+                only+=("$1")
+                shift
+            done
+            ;;
+        *)
+            args+=("$1")
+            shift
+            ;;
+    esac
+done
 
-# delete any previously generated pages
-rm -rf build
+# the device support flags are kept with the other caches when there is a cache directory
+if [ -n "$cache_dir" ]
+then
+    support_matrix="$cache_dir/support_matrix.json"
+else
+    support_matrix=".support_matrix.json"
+fi
+
+if [ "$precompute_support_matrix" = true ]
+then
+    # only store the device support flags, to be reused by later builds
+    python3 supported_devices.py "${args[@]}" --output "$support_matrix"
+    exit
+fi
+args+=("--support_matrix" "$support_matrix")
+
+# every stage adds the time and resources it used to the report of this build
+stats_args=()
+if [ -n "$stats" ]
+then
+    rm -f "$stats"
+    stats_args=("--stats" "$stats")
+fi
+
+# the folders of the generated content and of the built pages
+source_dir="autogenerated_source"
+build_dir="build"
+
+if [ ${#only[@]} -gt 0 ]
+then
+    # only the selected pages are generated, built and corrected, in folders of their own so that the content and
+    # pages of the full builds are kept. the pages are built from a new sphinx environment, not the cached one
+    args+=("--only" "${only[@]}")
+    source_dir="autogenerated_source_only"
+    build_dir="build_only"
+    rm -rf "$build_dir"
+    cache_dir=""
+    correct_args=()
+elif [ "$incremental" = true ]
+then
+    # keep the previously generated content and pages, only changed files are regenerated
+    args+=("--incremental")
+    correct_args=("--incremental")
+else
+    if [ -n "$cache_dir" ]
+    then
+        # the cached sphinx environment is only reused for content which keeps its modification time
+        args+=("--incremental")
+    else
+        # delete any previously generated content
+        rm -rf autogenerated_source
+    fi
+
+    # delete any previously generated pages
+    rm -rf build
+    correct_args=()
+fi
+
+if [ -n "$cache_dir" ] && [ ! -d autogenerated_source ] && [ -f "$cache_dir/.generation_manifest.json" ]
+then
+    # sphinx only reuses its environment for content which keeps its modification time, so in a new container the
+    # content of the last build is restored from the cache folder with its modification times
+    cp -a "$cache_dir/autogenerated_source" "$cache_dir/.generation_manifest.json" . || exit 1
+fi
+
+if [ -n "$asset_store" ] && [ -d "$build_dir" ]
+then
+    # the assets of the pages kept from the previous build are links to the store, and sphinx writes the theme files
+    # and the changed images in place. the other stages replace the assets they write instead
+    python3 asset_store.py --unlink "$build_dir" || exit 1
+fi
 
 # generate content
-python3 generate_src_rst_files.py "$@" || exit 1
+python3 generate_src_rst_files.py --jobs "$jobs" "${args[@]}" "${stats_args[@]}" || exit 1
+
+if [ -n "$cache_dir" ] && ! cmp -s .generation_manifest.json "$cache_dir/.generation_manifest.json"
+then
+    # keep the content for the next build, unless it was generated from the same inputs as the cached one
+    mkdir -p "$cache_dir"
+    rm -rf "$cache_dir/autogenerated_source" "$cache_dir/.generation_manifest.json"
+    cp -a autogenerated_source "$cache_dir/" || exit 1
+    cp -a .generation_manifest.json "$cache_dir/" || exit 1
+fi
+
+sphinx_args=()
+if [ "$jobs" = 0 ]
+then
+    sphinx_args+=("-j" "auto")
+elif [ "$jobs" -gt 1 ]
+then
+    sphinx_args+=("-j" "$jobs")
+fi
+if [ -n "$cache_dir" ]
+then
+    # doctrees and the pickled environment are kept outside of the build folder,
+    # one per configuration so that a changed conf.py does not reuse an environment built with another one
+    conf_hash=$(sha256sum "$source_dir/conf.py" | cut -c1-16)
+    sphinx_args+=("-d" "$cache_dir/doctrees/$conf_hash")
+fi
 
 # generate pages from content
-python3 sphinx-build.py -Q -b html autogenerated_source build || exit 1
+python3 sphinx-build.py -Q -b html "${sphinx_args[@]}" "$source_dir" "$build_dir" "${stats_args[@]}" || exit 1
+
+python3 correct_built_html_files.py --build_dir "$build_dir" --jobs "$jobs" "${correct_args[@]}" "${profile_args[@]}" "${stats_args[@]}" || exit 1
+
+if [ "$precompress" = true ]
+then
+    # minify the pages, style sheets and scripts, and write their gzip and brotli compressed copies
+    python3 precompress_built_files.py --build_dir "$build_dir" --minify --jobs "$jobs" "${stats_args[@]}" || exit 1
+fi
+
+if [ -n "$asset_store" ]
+then
+    # keep a single copy of the images, logos and theme files which are the same in other builds
+    python3 asset_store.py --store "$asset_store" "$source_dir" "$build_dir" || exit 1
+fi
 
-python3 correct_built_html_files.py || exit 1
+if [ -n "$stats" ]
+then
+    python3 build_stats.py "$stats"
+fi
@@ -0,0 +1,164 @@
+# This file is used by _make_docs.sh to keep one copy of every static asset of the generated content and built pages
+# Assets are stored by the hash of their content, and every copy of them is replaced by a hardlink to the stored file,
+# so that images, logos and theme files which are the same in many builds and projects are kept once on the disk the
+# builds are kept on. Copying or deploying a build folder still copies every asset it has.
+# python3 asset_store.py --store <folder> <directory>...  links the assets below the directories to the store
+# python3 asset_store.py --unlink <directory>...          gives the linked assets their own copy again
+
+import os
+import shutil
+import hashlib
+import argparse
+import build_stats
+
+# Files which are copied unchanged into many builds
+ASSET_EXTENSIONS = [
+    ".png",
+    ".svg",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".ico",
+    ".woff",
+    ".woff2",
+    ".ttf",
+    ".eot",
+    ".otf",
+    ".css",
+    ".js",
+]
+
+# Stored files whose content was checked by this process, a stored file written to in place no longer matches its hash
+VERIFIED_FILES = set()
+
+
+def hash_file(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(chunk)
+    build_stats.record_read(os.path.getsize(path))
+    return sha256.hexdigest()
+
+
+def list_assets(directories):
+    for directory in directories:
+        for dirpath, sub_dirs, files in os.walk(directory):
+            sub_dirs.sort()
+            for item in sorted(files):
+                path = os.path.join(dirpath, item)
+                if (
+                    os.path.splitext(item)[1].lower() in ASSET_EXTENSIONS
+                    and not os.path.islink(path)
+                ):
+                    yield path
+
+
+def get_stored_path(store_dir, path, digest):
+    return os.path.join(
+        store_dir, digest[:2], digest + os.path.splitext(path)[1].lower()
+    )
+
+
+def replace_file(path, source, link):
+    # Replaces path by a hardlink to source or by a copy of it, without writing to the file at path
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    if link:
+        os.link(source, tmp_path)
+    else:
+        shutil.copy2(source, tmp_path)
+        build_stats.record_write(os.path.getsize(tmp_path))
+    os.replace(tmp_path, path)
+
+
+def store_file(store_dir, path, digest):
+    """Return the stored copy of the content of path, which is added to the store if it is not stored yet."""
+    stored_path = get_stored_path(store_dir, path, digest)
+    if stored_path in VERIFIED_FILES:
+        return stored_path
+    if os.path.exists(stored_path) and hash_file(stored_path) != digest:
+        # written to in place through one of its links, the next links get a new copy
+        os.remove(stored_path)
+    if not os.path.exists(stored_path):
+        # the asset becomes the stored copy, unless the store is on another file system
+        os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+        try:
+            replace_file(stored_path, path, link=True)
+        except OSError:
+            replace_file(stored_path, path, link=False)
+    VERIFIED_FILES.add(stored_path)
+    return stored_path
+
+
+def link_assets(directories, store_dir):
+    """Replace the assets below the directories by hardlinks to the copy of their content in the store.
+
+    Assets which are links already were linked by a previous build, and are skipped without reading them, as the
+    stages replace assets instead of writing to them, and the build folder of incremental builds is unlinked first.
+    Returns the number of assets, of the ones which were linked and the bytes which they no longer take.
+    """
+    num_assets, num_linked, num_bytes = 0, 0, 0
+    for path in list_assets(directories):
+        num_assets += 1
+        stat = os.stat(path)
+        if stat.st_nlink > 1:
+            continue
+        stored_path = store_file(store_dir, path, hash_file(path))
+        if os.path.samestat(stat, os.stat(stored_path)):
+            continue
+        try:
+            replace_file(path, stored_path, link=True)
+        except OSError as e:
+            # the store is on another file system, or does not support hardlinks
+            print("Could not link {} to {}, {}".format(path, stored_path, e))
+            break
+        num_linked += 1
+        num_bytes += stat.st_size
+    return num_assets, num_linked, num_bytes
+
+
+def unlink_assets(directories):
+    """Give every linked asset below the directories its own copy again, before sphinx writes to it in place.
+
+    Returns the number of copied assets.
+    """
+    num_copied = 0
+    for path in list_assets(directories):
+        if os.stat(path).st_nlink > 1:
+            replace_file(path, path, link=False)
+            num_copied += 1
+    return num_copied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "directories",
+        type=str,
+        nargs="+",
+        help="Directories with the assets, directories which do not exist are skipped.",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        help="Folder the assets are stored in, it is best shared by all builds on the same file system.",
+    )
+    parser.add_argument(
+        "--unlink",
+        action="store_true",
+        help="Copy the linked assets instead of linking them.",
+    )
+    parsed_args = parser.parse_args()
+    directories = [item for item in parsed_args.directories if os.path.isdir(item)]
+    if parsed_args.unlink:
+        num_copied = unlink_assets(directories)
+        print("{} linked assets copied".format(num_copied))
+    elif parsed_args.store:
+        num_assets, num_linked, num_bytes = link_assets(directories, parsed_args.store)
+        print(
+            "{} of {} assets linked to {}, {:.1f} MB no longer stored twice".format(
+                num_linked, num_assets, parsed_args.store, num_bytes / 1e6
+            )
+        )
+    else:
+        parser.error("either --store or --unlink is required")
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import build_stats
+
+# Sphinx extension of the builds run through sphinx-build.py, which imports it, conf.py then adds it to the extensions
+
+# Files of the output folder modified after this time were written by the build
+BUILD_START_TIME = time.time()
+
+
+def report_serial_fallback(app):
+    # Sphinx reads or writes serially whenever one of the loaded extensions is not declared parallel safe,
+    # which it only reports as a warning hidden by -Q, so the fallback is reported here before building
+    if app.parallel <= 1:
+        return
+    for typ in ["read", "write"]:
+        attrname = "parallel_{}_safe".format(typ)
+        unsafe_extensions = [
+            name
+            for name, extension in app.extensions.items()
+            if not getattr(extension, attrname, None)
+        ]
+        if unsafe_extensions:
+            sys.stderr.write(
+                "warning: {} are not declared {}, doing serial {} instead of using {} processes\n".format(
+                    ", ".join(unsafe_extensions), attrname, typ, app.parallel
+                )
+            )
+
+
+def record_read_docs(app, env, docnames):
+    build_stats.record_read(
+        sum(os.path.getsize(env.doc2path(docname)) for docname in docnames),
+        len(docnames),
+    )
+
+
+def record_written_files(app, exception):
+    for directory, _, files in os.walk(app.outdir):
+        for item in files:
+            stat = os.stat(os.path.join(directory, item))
+            if stat.st_mtime >= BUILD_START_TIME:
+                build_stats.record_write(stat.st_size)
+
+
+def setup(app):
+    # builder-inited is emitted once every extension of conf.py is loaded
+    app.connect("builder-inited", report_serial_fallback)
+    if build_stats.REPORT_PATH is not None:
+        app.connect("env-before-read-docs", record_read_docs)
+        app.connect("build-finished", record_written_files)
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
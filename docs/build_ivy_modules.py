@@ -0,0 +1,208 @@
+# This file builds the documentation of several projects of ivy_modules.txt in one invocation
+# The requirements of all projects are installed once, into one environment, then the projects are built in parallel
+# by a bounded number of workers, each with the files of the doc-builder and its own folder of the shared cache.
+# The static assets of all projects are kept once, in the assets folder of the cache.
+# All arguments which are not options of this file are passed on to _make_docs.sh of every project, e.g.
+# python3 build_ivy_modules.py --projects_dir ~/projects --workers 3 --jobs 2 --incremental
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+THIS_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# Generated and cached files of a previous build of the doc-builder itself, which are not copied into the projects
+NOT_COPIED = [
+    "__pycache__",
+    "build",
+    "autogenerated_source",
+    "build_only",
+    "autogenerated_source_only",
+    ".support_matrix.json",
+    ".generation_manifest.json",
+]
+
+
+def read_module_names():
+    with open(os.path.join(THIS_DIR, "ivy_modules.txt"), "r") as f:
+        return [line.strip() for line in f.readlines() if line.strip()]
+
+
+def install_requirements(project_dirs):
+    # One installation for all projects, skipped when the same requirements are installed already
+    return subprocess.run(
+        ["bash", os.path.join(THIS_DIR, "install_requirements.sh")] + project_dirs
+    ).returncode
+
+
+def build_module(
+    module_name, project_dir, cache_dir, asset_store, make_docs_args, log_path
+):
+    """Build the documentation of one project as entrypoint.sh does, with the output written to the log file.
+
+    Returns the name of the module, the return code of _make_docs.sh and the seconds the build took.
+    """
+    start_time = time.perf_counter()
+    docs_dir = os.path.join(project_dir, "docs")
+    shutil.copytree(
+        THIS_DIR,
+        docs_dir,
+        dirs_exist_ok=True,
+        ignore=shutil.ignore_patterns(*NOT_COPIED),
+    )
+    cache_args = []
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_args = ["--cache_dir", cache_dir]
+    if asset_store is not None:
+        cache_args += ["--asset_store", asset_store]
+    with open(log_path, "w") as log:
+        returncode = subprocess.run(
+            ["bash", "_make_docs.sh", "--root_dir", "../" + module_name]
+            + make_docs_args
+            + cache_args,
+            cwd=docs_dir,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        ).returncode
+
+        # delete the code of the doc-builder
+        subprocess.run(
+            ["bash", "remove_files.sh"], cwd=docs_dir, stdout=log, stderr=subprocess.STDOUT
+        )
+        os.remove(os.path.join(docs_dir, "remove_files.sh"))
+    return module_name, returncode, time.perf_counter() - start_time
+
+
+def build_modules(
+    projects_dir,
+    module_names,
+    workers=2,
+    cache_dir=None,
+    log_dir="build_logs",
+    make_docs_args=(),
+    install=True,
+):
+    """Build the documentation of the projects of the modules, which are cloned into projects_dir.
+
+    Returns the name, return code and seconds of every build, in the order of module_names.
+    """
+    project_dirs = dict()
+    for module_name in module_names:
+        project_dir = os.path.abspath(os.path.join(projects_dir, module_name))
+        if os.path.isdir(project_dir):
+            project_dirs[module_name] = project_dir
+        else:
+            print("{} is not built, {} does not exist".format(module_name, project_dir))
+
+    if install and project_dirs:
+        if install_requirements(list(project_dirs.values())) != 0:
+            print("Failed to install the requirements")
+            return [(module_name, 1, 0.0) for module_name in project_dirs]
+
+    os.makedirs(log_dir, exist_ok=True)
+    results = dict()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                build_module,
+                module_name,
+                project_dir,
+                None if cache_dir is None else os.path.join(cache_dir, module_name),
+                None if cache_dir is None else os.path.join(cache_dir, "assets"),
+                list(make_docs_args),
+                os.path.abspath(os.path.join(log_dir, module_name + ".log")),
+            ): module_name
+            for module_name, project_dir in project_dirs.items()
+        }
+        for future in as_completed(futures):
+            # A project which could not be built, e.g. as its docs folder could not be written, fails on its own
+            try:
+                module_name, returncode, elapsed = future.result()
+            except Exception as e:
+                module_name = futures[future]
+                results[module_name] = (module_name, 1, 0.0)
+                print(
+                    "{} failed, {}: {}".format(module_name, type(e).__name__, e)
+                )
+                continue
+            results[module_name] = (module_name, returncode, elapsed)
+            print(
+                "{} {} in {:.1f}s".format(
+                    module_name, "built" if returncode == 0 else "failed", elapsed
+                )
+            )
+    return [results[module_name] for module_name in project_dirs]
+
+
+def print_timings(results, elapsed):
+    print("\n{:<24}{:>10}{:>12}".format("", "status", "seconds"))
+    for module_name, returncode, module_elapsed in results:
+        print(
+            "{:<24}{:>10}{:>12.1f}".format(
+                module_name, "ok" if returncode == 0 else "failed", module_elapsed
+            )
+        )
+    print(
+        "{:<24}{:>10}{:>12.1f}   ({:.1f}s of builds)".format(
+            "total", "", elapsed, sum(result[2] for result in results)
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--projects_dir",
+        type=str,
+        required=True,
+        help="Folder the projects are cloned into, each in a folder named after its module.",
+    )
+    parser.add_argument(
+        "--modules",
+        type=str,
+        nargs="+",
+        help="Modules of ivy_modules.txt to build, all of them by default.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Number of projects built at the same time.",
+    )
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        default=os.environ.get("DOCS_CACHE_DIR"),
+        help="Folder the caches of the builds are kept in, one folder per project, DOCS_CACHE_DIR by default.",
+    )
+    parser.add_argument(
+        "--log_dir",
+        type=str,
+        default="build_logs",
+        help="Folder the output of every build is written to.",
+    )
+    parser.add_argument(
+        "--skip_install",
+        action="store_true",
+        help="Do not install the requirements of the projects.",
+    )
+    parsed_args, make_docs_args = parser.parse_known_args()
+
+    start_time = time.perf_counter()
+    results = build_modules(
+        parsed_args.projects_dir,
+        parsed_args.modules or read_module_names(),
+        parsed_args.workers,
+        None if parsed_args.cache_dir is None else os.path.abspath(parsed_args.cache_dir),
+        parsed_args.log_dir,
+        make_docs_args,
+        not parsed_args.skip_install,
+    )
+    print_timings(results, time.perf_counter() - start_time)
+    if any(returncode != 0 for _, returncode, _ in results):
+        sys.exit(1)
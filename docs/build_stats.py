@@ -0,0 +1,149 @@
+# This file is used by the stages of the documentation building pipeline to measure their time and resources
+# Every stage adds its measurements to a JSON report given with --stats, which is printed as a table by running
+# python3 build_stats.py <report>
+
+import os
+import sys
+import json
+import time
+import atexit
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # not available on windows, where only the cpu time of the process itself is measured
+    resource = None
+
+# The report the measurements of this process are added to, None when nothing is measured
+REPORT_PATH = None
+STAGE = None
+
+# Files and bytes read and written so far, counted where the stages read and write files
+IO_COUNTS = {"files_read": 0, "bytes_read": 0, "files_written": 0, "bytes_written": 0}
+
+# The measurements of this process, in the order they started
+MEASUREMENTS = list()
+RUNNING = list()
+
+
+def record_read(num_bytes, num_files=1):
+    IO_COUNTS["files_read"] += num_files
+    IO_COUNTS["bytes_read"] += num_bytes
+
+
+def record_write(num_bytes, num_files=1):
+    IO_COUNTS["files_written"] += num_files
+    IO_COUNTS["bytes_written"] += num_bytes
+
+
+def add_io_counts(io_counts):
+    # Counts of the files read and written by a worker process
+    for key, value in io_counts.items():
+        IO_COUNTS[key] += value
+
+
+def get_io_counts_since(io_counts):
+    return {key: value - io_counts[key] for key, value in IO_COUNTS.items()}
+
+
+def _get_usage():
+    # Wall time, cpu time of the process and its finished child processes, and the peak rss of either of them
+    if resource is None:
+        return time.perf_counter(), time.process_time(), None
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_time = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+    peak_rss = max(own.ru_maxrss, children.ru_maxrss)
+    if sys.platform != "darwin":
+        # kilobytes everywhere but on macOS
+        peak_rss *= 1024
+    return time.perf_counter(), cpu_time, peak_rss
+
+
+@contextmanager
+def measure(name):
+    """Measure the code run in the with block, as a part of the measurement running around it.
+
+    The peak rss is the largest rss the process or one of its child processes had until the end of the block.
+    """
+    if REPORT_PATH is None:
+        yield
+        return
+    measurement = {
+        "stage": STAGE,
+        "name": name,
+        "parent": RUNNING[-1]["name"] if RUNNING else None,
+    }
+    MEASUREMENTS.append(measurement)
+    RUNNING.append(measurement)
+    start_wall_time, start_cpu_time, _ = _get_usage()
+    start_io_counts = dict(IO_COUNTS)
+    try:
+        yield
+    finally:
+        wall_time, cpu_time, peak_rss = _get_usage()
+        measurement["wall_time"] = round(wall_time - start_wall_time, 4)
+        measurement["cpu_time"] = round(cpu_time - start_cpu_time, 4)
+        measurement["peak_rss_bytes"] = peak_rss
+        measurement.update(get_io_counts_since(start_io_counts))
+        RUNNING.remove(measurement)
+
+
+def start(report_path, stage):
+    # Measures the whole stage run by this process, the measurements are added to the report when it exits
+    global REPORT_PATH, STAGE
+    REPORT_PATH, STAGE = report_path, stage
+    stage_measurement = measure(stage)
+    stage_measurement.__enter__()
+
+    def finish():
+        stage_measurement.__exit__(None, None, None)
+        save()
+
+    atexit.register(finish)
+
+
+def load(report_path):
+    if not os.path.exists(report_path):
+        return {"measurements": []}
+    with open(report_path, "r") as f:
+        return json.load(f)
+
+
+def save():
+    report = load(REPORT_PATH)
+    report["measurements"] += MEASUREMENTS
+    with open(REPORT_PATH + ".tmp", "w") as f:
+        json.dump(report, f, indent=1)
+    os.replace(REPORT_PATH + ".tmp", REPORT_PATH)
+
+
+def print_report(report_path):
+    print(
+        "{:<48}{:>10}{:>10}{:>10}{:>14}{:>16}".format(
+            "", "wall s", "cpu s", "rss MB", "files r/w", "MB r/w"
+        )
+    )
+    depths = dict()
+    for measurement in load(report_path)["measurements"]:
+        key = (measurement["stage"], measurement["name"])
+        depth = depths.get((measurement["stage"], measurement["parent"]), -1) + 1
+        depths[key] = depth
+        peak_rss = measurement["peak_rss_bytes"]
+        print(
+            "{:<48}{:>10.2f}{:>10.2f}{:>10}{:>14}{:>16}".format(
+                "  " * depth + measurement["name"],
+                measurement["wall_time"],
+                measurement["cpu_time"],
+                "-" if peak_rss is None else "{:.0f}".format(peak_rss / 1e6),
+                "{}/{}".format(measurement["files_read"], measurement["files_written"]),
+                "{:.1f}/{:.1f}".format(
+                    measurement["bytes_read"] / 1e6, measurement["bytes_written"] / 1e6
+                ),
+            )
+        )
+
+
+if __name__ == "__main__":
+    print_report(sys.argv[1])
@@ -1,320 +1,822 @@
 import os
+import re
+import sys
 import json
+import time
+import pstats
+import cProfile
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import build_stats
 
 this_dir = os.path.dirname(os.path.realpath(__file__))
-with open(os.path.join(this_dir, "permitted_namespaces.json"), "r") as file:
-    PERMITTED_NAMESPACES = json.loads(file.read())
 
+# Content hashes of the pages as they were after their last correction, kept inside the build directory
+CORRECTED_PAGES_MANIFEST = ".corrected_pages.json"
 
-def trim_namespace(full_namespace):
-    for namespace_to_check, permitted_namespace in PERMITTED_NAMESPACES.items():
-        if namespace_to_check in full_namespace:
-            return permitted_namespace
-    return full_namespace
+# Markup emitted by sphinx which is searched for while correcting a page
+LOGO_LINK = '      <link rel="icon" type="image/png" href="https://github.com/unifyai/unifyai.github.io/blob/master/img/externally_linked/ivy_logo_only.png?raw=true">\n'
+SUPPORTED_FRAMEWORKS_LINE = (
+    '<div class="line"><strong>Supported Frameworks:</strong></div>'
+)
+EXTERNAL_REFERENCE = '<a class="reference external'
+PRENAME_SPAN = '<span class="sig-prename descclassname">'
+SIG_OBJECT_DT = '<dt class="sig sig-object py"'
+INTERNAL_REFERENCE = '<a class="reference internal" href="'
+PARAMETERS_DT = '<dt class="field-odd">Parameters</dt>'
+XREF_CODE = '<code class="xref py py-class docutils literal notranslate"><span class="pre">'
+TENSOR_TYPES = ("_DeviceArray", "DeviceArray", "ndarray", "Tensor")
 
+# Replacements of the text of every page
+CONSTANTS = {
+    # Replace 3.14 with pi
+    "3.141592653589793": "π",
+    # Remove # noqa from all files
+    # This gets added to the markup in cases of hyperlinks where the line size gets too long
+    "# noqa": "",
+}
 
-def modify_html_file(html_filepath):
-    # Read markup generated by sphinx
-    with open(html_filepath) as file:
-        html_contents = file.read()
-
-    # Add logo to page header
-    logo_index = html_contents.find('    <link rel="stylesheet"')
-    end_index = html_contents[logo_index:].find(" />")
-    html_contents_mod = (
-        html_contents[0 : logo_index + end_index + 4]
-        + '      <link rel="icon" type="image/png" href="https://github.com/unifyai/unifyai.github.io/blob/master/img/externally_linked/ivy_logo_only.png?raw=true">\n'
-        + html_contents[logo_index + end_index + 4 :]
-    )
-    html_contents = html_contents_mod
+# The markup rewritten by the corrections, which every page is scanned for once, with the correction it belongs to.
+# The links to the modules of ivy_modules.txt are added by the rewrite context. While scanning, only the markup
+# which can be rewritten at the current position is searched for, e.g. list items only inside the breadcrumbs.
+PAGE_TOKENS = [
+    ("stylesheet", '<link rel="stylesheet"'),
+    ("supported_frameworks", SUPPORTED_FRAMEWORKS_LINE),
+    ("external_reference", EXTERNAL_REFERENCE),
+    ("prename", PRENAME_SPAN),
+    ("breadcrumbs", '<ul class="wy-breadcrumbs"'),
+    ("no_title", "&lt;no title&gt;"),
+    ("list_item_end", "</li>"),
+    ("list_item", "<li>"),
+    ("list_end", "</ul>"),
+    ("sig_object", SIG_OBJECT_DT),
+    ("internal_reference", INTERNAL_REFERENCE),
+    ("paragraph_end", "</p>"),
+    ("paragraph", "<p"),
+    ("definition_list_end", "</dl>"),
+    ("parameters", PARAMETERS_DT),
+    ("xref_code", XREF_CODE),
+] + [("constant", constant) for constant in CONSTANTS]
+CORRECTION_NAMES = {
+    "stylesheet": "insert_logo",
+    "supported_frameworks": "insert_logo",
+    "external_reference": "insert_logo",
+    "paragraph": "insert_logo",
+    "paragraph_end": "insert_logo",
+    "constant": "replace_constants",
+    "module_link": "rewrite_module_links",
+    "prename": "trim_namespaces",
+    "breadcrumbs": "fix_breadcrumbs",
+    "no_title": "fix_breadcrumbs",
+    "list_item": "fix_breadcrumbs",
+    "list_item_end": "fix_breadcrumbs",
+    "list_end": "fix_breadcrumbs",
+    "sig_object": "link_instance_methods",
+    "internal_reference": "link_instance_methods",
+    "definition_list_end": "link_instance_methods",
+    "parameters": "strip_tensor_types",
+    "xref_code": "strip_tensor_types",
+}
 
-    # Making logo layout responsive
-    support_index = html_contents.find(
-        '<div class="line"><strong>Supported Frameworks:</strong></div>'
-    )
-    if support_index != -1:
-        p_index = html_contents[support_index:].find("<p") + support_index + 2
-        html_contents = (
-            html_contents[0:p_index]
-            + " class=supported_frameworks"
-            + html_contents[p_index:]
+# "of ivy.<fn>" and "for ivy.<fn>" mentions inside docstrings, each ending at the next space or dot
+IVY_CALL_RE = re.compile(r"(?:of|for) ivy\.")
+IVY_CALL_END_RE = re.compile(r"[ .]")
+
+
+class RewriteContext:
+    """
+    Lookup tables used while correcting every page, built once per run.
+
+    Every page is corrected in a single scan for the markup of all corrections, module links are part of that scan,
+    and namespaces are trimmed through a character trie of the permitted namespaces, so the cost of correcting a page
+    does not grow with the number of modules or namespaces.
+    """
+
+    def __init__(self, module_names, permitted_namespaces):
+        self.module_links = {
+            module_name: '../{}"'.format(module_name.split("_")[-1])
+            for module_name in module_names
+        }
+        module_link_pattern = r"docs/(?:{})\.html".format(
+            "|".join(
+                re.escape(module_name)
+                for module_name in sorted(self.module_links, key=len, reverse=True)
+            )
         )
-        p_end_index = html_contents[support_index:].find("</p>") + support_index
-        a_indices = [
-            ind + 18
-            for ind in range(p_index, p_end_index)
-            if html_contents[ind : ind + 18] == "reference external"
+        self.text_re = re.compile(
+            "|".join(
+                [re.escape(constant) for constant in CONSTANTS]
+                + ([module_link_pattern] if self.module_links else [])
+            )
+        )
+
+        # The first character of every token and the expression matching the rest of it
+        self.tokens = [
+            (kind, literal[0], re.escape(literal[1:])) for kind, literal in PAGE_TOKENS
         ]
-        res = 0
-        for a_index in a_indices:
-            a_index += res
-            html_contents = html_contents[0:a_index] + " logo" + html_contents[a_index:]
-            res += 5
+        if self.module_links:
+            self.tokens.append(("module_link", "d", module_link_pattern[1:]))
+        self.token_kinds = {
+            "t{}".format(index): kind for index, (kind, _, _) in enumerate(self.tokens)
+        }
+        self._token_res = {}
 
-    # Replace 3.14 with pi
-    html_contents = html_contents.replace("3.141592653589793", "π")
+        # The first permitted namespace contained in a namespace takes precedence
+        self.trimmed_namespaces = list(permitted_namespaces.values())
+        self.namespace_trie = {}
+        for order, namespace_to_check in enumerate(permitted_namespaces):
+            node = self.namespace_trie
+            for char in namespace_to_check:
+                node = node.setdefault(char, {})
+            node[None] = order
+        self._trim_cache = {}
 
-    # Remove # noqa from all files
-    # This gets added to the markup in cases of hyperlinks where the line size gets too long
-    html_contents = html_contents.replace("# noqa", "")
+    def get_token_re(self, state):
+        """Return the expression finding the tokens which can be rewritten in a state of the corrections.
 
+        The tokens are grouped by their first character, which is all that is compared at most positions of a page.
+        The group of every match is named by the index of its token. Every expression is compiled once per run.
+        """
+        if state not in self._token_res:
+            kinds = get_active_kinds(*state)
+            branches = dict()
+            for index, (kind, first_char, rest) in enumerate(self.tokens):
+                if kind in kinds:
+                    branches.setdefault(first_char, []).append(
+                        "(?P<t{}>{})".format(index, rest)
+                    )
+            self._token_res[state] = re.compile(
+                "|".join(
+                    re.escape(first_char) + "(?:" + "|".join(rests) + ")"
+                    for first_char, rests in branches.items()
+                )
+            )
+        return self._token_res[state]
+
+    def rewrite_text(self, text):
+        # The constants and module links of markup which is rewritten as a whole
+        return self.text_re.sub(lambda match: self.replace_text(match.group()), text)
+
+    def replace_text(self, text):
+        if text in CONSTANTS:
+            return CONSTANTS[text]
+        # For every module, update path of its reference in current file
+        return self.module_links[text[5:-5]]
+
+    def trim_namespace(self, full_namespace):
+        if full_namespace in self._trim_cache:
+            return self._trim_cache[full_namespace]
+        first = self.namespace_trie.get(None)
+        for start in range(len(full_namespace)):
+            node = self.namespace_trie
+            for char in full_namespace[start:]:
+                node = node.get(char)
+                if node is None:
+                    break
+                if None in node and (first is None or node[None] < first):
+                    first = node[None]
+        trimmed = full_namespace if first is None else self.trimmed_namespaces[first]
+        self._trim_cache[full_namespace] = trimmed
+        return trimmed
+
+
+def load_rewrite_context():
     # Read all ivy modules for which markup is generated
     with open(os.path.join(this_dir, "ivy_modules.txt"), "r") as f:
         module_names = [line.replace("\n", "") for line in f.readlines()]
+    with open(os.path.join(this_dir, "permitted_namespaces.json"), "r") as file:
+        permitted_namespaces = json.loads(file.read())
+    return RewriteContext(module_names, permitted_namespaces)
 
-    # For every module, update path of its reference in current file
-    for module_name in module_names:
-        html_contents = html_contents.replace(
-            "docs/{}.html".format(module_name),
-            '../{}"'.format(module_name.split("_")[-1]),
+
+def link_docstring_calls(docstring_content, html_filepath):
+    # Link mentions of "of ivy.<fn>" and "for ivy.<fn>" to the functional page of <fn>
+    function_call_indices = []
+    for match in IVY_CALL_RE.finditer(docstring_content):
+        call_end = IVY_CALL_END_RE.search(docstring_content, match.end())
+        if call_end is None:
+            continue
+        function_call_indices.append((match.start(), call_end.start()))
+    function_calls = []
+    for index_start, index_end in function_call_indices:
+        if docstring_content[index_start] == "f":
+            function_calls.append((docstring_content[index_start:index_end], False))
+        else:
+            function_calls.append((docstring_content[index_start:index_end], True))
+    linked_calls = [None] * len(function_calls)
+    i = 0
+    for function_call, flag in function_calls:
+        function_name = function_call.split(".")
+        if len(function_name) < 2:
+            continue
+        function_name = function_name[1]
+        paths = html_filepath.split("/")
+        index = [i for i in range(len(paths)) if function_name in paths[i]]
+        if len(index) == 0:
+            continue
+        dot = ""
+        if len(index) == 2:
+            dot = "."
+        final_path = '<a href="{}./{}/{}_functional.html">{}</a>'.format(
+            dot, function_name, function_name, function_call.split()[1]
         )
+        if flag:
+            linked_calls[i] = "of {}".format(final_path)
+        else:
+            linked_calls[i] = "for {}".format(final_path)
+        i += 1
+    res = 0
+    for i in range(len(function_call_indices)):
+        if linked_calls[i]:
+            docstring_content = (
+                docstring_content[0 : function_call_indices[i][0] + res]
+                + linked_calls[i]
+                + docstring_content[function_call_indices[i][1] + res :]
+            )
+            res += len(linked_calls[i]) - (
+                function_call_indices[i][1] - function_call_indices[i][0]
+            )
+    return docstring_content
 
-    # Update namespaces for inline code in documentation
-    contents_split1 = html_contents.split('<span class="sig-prename descclassname">')
-    contents_split2 = [item.split("</span>") for item in contents_split1]
-    contents_split2_modded = [contents_split2[0]] + [
-        [trim_namespace(item[0])] + item[1:] for item in contents_split2[1:]
-    ]
-    contents_split1_modded = ["</span>".join(item) for item in contents_split2_modded]
-    html_contents_modded = '<span class="sig-prename descclassname">'.join(
-        contents_split1_modded
-    )
 
-    # Update links to remove "<no title>" from submodules to be stepped
-    breadcrumbs_index = html_contents_modded.find("wy-breadcrumbs")
-    no_title_index = html_contents_modded[breadcrumbs_index:].find("&lt;no title&gt;")
-    if no_title_index != -1:
-        start_index = html_contents_modded[
-            0 : breadcrumbs_index + no_title_index
-        ].rfind("<li>")
-        end_index = html_contents_modded[start_index:].find("</li>")
-        html_contents_modded = html_contents_modded.replace(
-            html_contents_modded[start_index : start_index + end_index + 6], ""
-        )
-        no_title_index = html_contents_modded[breadcrumbs_index:].find(
-            "&lt;no title&gt;"
+def remove_suffix(pieces, suffix):
+    # Removes the suffix from the end of the pieces of a page when they end with it
+    tail = ""
+    index = len(pieces)
+    while index > 0 and len(tail) < len(suffix):
+        index -= 1
+        tail = pieces[index] + tail
+    if tail.endswith(suffix):
+        del pieces[index:]
+        pieces.append(tail[: -len(suffix)])
+
+
+def get_instance_method_extension(function_def, submodule_name):
+    # The page and anchor of an array or container instance method, found from the id of its definition
+    path_start = function_def.find('id="') + 4
+    path_end = path_start + function_def[path_start:].find('"')
+    method_name = function_def[path_start:path_end].split(".")[-1]
+    if "array_methods" in function_def:
+        return "array/{}.html#ArrayWith{}.{}".format(
+            submodule_name, submodule_name.capitalize(), method_name
         )
+    return "container/{}.html#ContainerWith{}.{}".format(
+        submodule_name, submodule_name.capitalize(), method_name
+    )
 
-    if "functional/ivy/" in html_filepath:
-        function_def_index = [
-            i
-            for i in range(len(html_contents_modded))
-            if html_contents_modded.startswith('<dt class="sig sig-object py"', i)
-        ]
-        function_defs = []
-        for index in function_def_index:
-            function_def = html_contents_modded[
-                index : index + html_contents_modded[index:].find("\n")
-            ]
-            if "array_methods" in function_def or "container_methods" in function_def:
-                function_defs.append(
-                    (
-                        function_def,
-                        index,
-                        index + html_contents_modded[index:].find("\n"),
-                    )
-                )
 
+def get_active_kinds(
+    logo_inserted,
+    supported_frameworks,
+    breadcrumbs,
+    li_open,
+    instance_methods,
+    pending_references,
+    pending_docstrings,
+    in_parameters,
+):
+    # The kinds of tokens which can be rewritten in the given state of the corrections, see correct_page
+    active_kinds = {
+        "stylesheet": not logo_inserted,
+        "supported_frameworks": supported_frameworks == 0,
+        "external_reference": supported_frameworks == 2,
+        "constant": True,
+        "prename": True,
+        "breadcrumbs": breadcrumbs == 0,
+        "no_title": breadcrumbs == 1 and li_open,
+        "list_item_end": breadcrumbs in (1, 2),
+        "list_item": breadcrumbs == 1,
+        "list_end": breadcrumbs == 1,
+        "sig_object": instance_methods,
+        "internal_reference": pending_references,
+        "paragraph_end": supported_frameworks == 2,
+        "paragraph": supported_frameworks == 1 or pending_docstrings,
+        "definition_list_end": pending_docstrings,
+        "parameters": not in_parameters,
+        "xref_code": in_parameters,
+        "module_link": True,
+    }
+    return frozenset(kind for kind, active in active_kinds.items() if active)
+
+
+def correct_page(html_contents, html_filepath, context, correction_times=None):
+    """Apply every correction to the markup of a page, in a single scan for the markup they rewrite.
+
+    The seconds spent in every correction are added to correction_times when it is given,
+    along with the seconds of the scan itself.
+    """
+    start_time = time.perf_counter()
+    pieces = []
+    pos = 0
+
+    # Add logo to page header, and make the logo layout of the supported frameworks responsive:
+    # 0 before the supported frameworks line, 1 before its paragraph, 2 inside the paragraph and 3 after it
+    logo_inserted = False
+    supported_frameworks = 0
+
+    # Update links to remove "<no title>" from submodules to be stepped: 0 before the breadcrumbs, 1 inside them,
+    # 2 inside the item of the first "<no title>" link, which is removed at its end, and 3 after it
+    breadcrumbs = 0
+    last_li = None
+    li_open = False
+
+    # The source links and the docstrings of the array and container instance methods listed on functional pages,
+    # each definition is followed by its source link and its docstring
+    instance_methods = "functional/ivy/" in html_filepath
+    submodule_name = None
+    if instance_methods:
         submodule_str = "functional/ivy/"
         submodule_start = html_filepath.find(submodule_str) + len(submodule_str)
         submodule_end = submodule_start + html_filepath[submodule_start:].find("/")
         submodule_name = html_filepath[submodule_start:submodule_end]
-        res = 0
-        for i in range(len(function_defs)):
-            function_def, start_index, end_index = (
-                function_defs[i][0],
-                function_defs[i][1],
-                function_defs[i][2],
-            )
-            path_start = function_def.find('id="') + 4
-            path_end = path_start + function_def[path_start:].find('"')
-            path = function_def[path_start:path_end]
-            if "array_methods" in function_def:
-                extension = "array/{}.html#ArrayWith{}.{}".format(
-                    submodule_name, submodule_name.capitalize(), path.split(".")[-1]
-                )
-            else:
-                extension = "container/{}.html#ContainerWith{}.{}".format(
-                    submodule_name, submodule_name.capitalize(), path.split(".")[-1]
-                )
-            ref_string = '<a class="reference internal" href="'
-            ref_start_index = (
-                start_index
-                + res
-                + html_contents_modded[start_index + res :].find(ref_string)
-                + len(ref_string)
-            )
-            ref_end_index = ref_start_index + html_contents_modded[
-                ref_start_index:
-            ].find('"><span')
-            ref = html_contents_modded[ref_start_index:ref_end_index]
-            ref_len = len(ref)
-            new_ref_str = "_modules/ivy/"
-            new_ref = ref[0 : ref.find(new_ref_str) + len(new_ref_str)]
-            new_ref += extension
-            new_ref_len = len(new_ref)
-            html_contents_modded = (
-                html_contents_modded[:ref_start_index]
-                + new_ref
-                + html_contents_modded[ref_end_index:]
-            )
-            res += new_ref_len - ref_len
+    pending_references = []
+    pending_docstrings = 0
 
-        for i in range(len(function_defs)):
-            function_def, start_index, end_index = (
-                function_defs[i][0],
-                function_defs[i][1],
-                function_defs[i][2],
-            )
-            function_end_index = start_index + html_contents_modded[start_index:].find(
-                "</dl>"
-            )
-            docstring_start_index = (
-                start_index + html_contents_modded[start_index:].find("<p>") + 3
-            )
-            docstring_end_index = docstring_start_index + html_contents_modded[
-                docstring_start_index:function_end_index
-            ].find("</p>")
-            docstring_content = html_contents_modded[
-                docstring_start_index:docstring_end_index
-            ]
+    # Framework specific tensor types are removed from the type hints after the first parameters
+    in_parameters = False
+
+    handler_seconds = 0.0
+    token_state = None
+    while True:
+        # The expression finding the tokens is only chosen again when the state of a correction changes
+        state = (
+            logo_inserted,
+            supported_frameworks,
+            breadcrumbs,
+            li_open,
+            instance_methods,
+            len(pending_references) > 0,
+            pending_docstrings > 0,
+            in_parameters,
+        )
+        if state != token_state:
+            token_state = state
+            token_re = context.get_token_re(state)
+        match = token_re.search(html_contents, pos)
+        if match is None:
+            break
+        if correction_times is not None:
+            handler_start_time = time.perf_counter()
+        kind = context.token_kinds[match.lastgroup]
+        token_start, token_end = match.span()
+        pieces.append(html_contents[pos:token_start])
+        pos = token_end
+        token = match.group()
+        correction = CORRECTION_NAMES[kind]
+
+        if kind == "constant" or kind == "module_link":
+            token = context.replace_text(token)
+
+        elif kind == "stylesheet":
+            close_index = html_contents.find(" />", token_end)
             if (
-                docstring_end_index - docstring_start_index < 10
-                or docstring_start_index == 3
-                or "functional" not in html_filepath
-                or "code" in docstring_content
+                not logo_inserted
+                and close_index != -1
+                and html_contents[token_start - 4 : token_start] == "    "
             ):
-                continue
-            docstring_content = docstring_content.replace("<cite>", "")
-            docstring_content = docstring_content.replace("</cite>", "")
-            function_call_indices = []
-            for i in range(len(docstring_content)):
-                if docstring_content.startswith("of ivy.", i):
-                    indexes = [
-                        index
-                        for index in range(i + 7, len(docstring_content))
-                        if docstring_content[index] in [" ", "."]
-                    ]
-                    if len(indexes) == 0:
-                        continue
-                    index_end = indexes[0]
-                    function_call_indices.append((i, index_end))
-                if docstring_content.startswith("for ivy.", i):
-                    indexes = [
-                        index
-                        for index in range(i + 8, len(docstring_content))
-                        if docstring_content[index] in [" ", "."]
-                    ]
-                    if len(indexes) == 0:
-                        continue
-                    index_end = indexes[0]
-                    function_call_indices.append((i, index_end))
-            function_calls = []
-            for index_start, index_end in function_call_indices:
-                if docstring_content[index_start] == "f":
-                    function_calls.append(
-                        (docstring_content[index_start:index_end], False)
-                    )
-                else:
-                    function_calls.append(
-                        (docstring_content[index_start:index_end], True)
-                    )
-            linked_calls = [None] * len(function_calls)
-            i = 0
-            for function_call, flag in function_calls:
-                function_name = function_call.split(".")
-                if len(function_name) < 2:
-                    continue
-                function_name = function_name[1]
-                paths = html_filepath.split("/")
-                index = [i for i in range(len(paths)) if function_name in paths[i]]
-                if len(index) == 0:
-                    continue
-                dot = ""
-                if len(index) == 2:
-                    dot = "."
-                final_path = '<a href="{}./{}/{}_functional.html">{}</a>'.format(
-                    dot, function_name, function_name, function_call.split()[1]
-                )
-                if flag:
-                    linked_calls[i] = "of {}".format(final_path)
-                else:
-                    linked_calls[i] = "for {}".format(final_path)
-                i += 1
-            res = 0
-            for i in range(len(function_call_indices)):
-                if linked_calls[i]:
-                    docstring_content = (
-                        docstring_content[0 : function_call_indices[i][0] + res]
-                        + linked_calls[i]
-                        + docstring_content[function_call_indices[i][1] + res :]
-                    )
-                    res += len(linked_calls[i]) - (
-                        function_call_indices[i][1] - function_call_indices[i][0]
+                logo_inserted = True
+                pos = close_index + 4
+                token = context.rewrite_text(html_contents[token_start:pos]) + LOGO_LINK
+
+        elif kind == "supported_frameworks":
+            supported_frameworks = 1
+
+        elif kind == "paragraph":
+            if supported_frameworks == 1:
+                supported_frameworks = 2
+                token += " class=supported_frameworks"
+            elif pending_docstrings and html_contents.startswith("<p>", token_start):
+                # Link the functions mentioned in the docstring of an instance method
+                correction = "link_instance_methods"
+                pending_docstrings -= 1
+                docstring_end = html_contents.find("</p>", token_start + 3)
+                if (
+                    docstring_end != -1
+                    and html_contents.find("</dl>", token_start, docstring_end) == -1
+                ):
+                    docstring_content = context.rewrite_text(
+                        html_contents[token_start + 3 : docstring_end]
                     )
-            html_contents_modded = (
-                html_contents_modded[0:docstring_start_index]
-                + docstring_content
-                + html_contents_modded[docstring_end_index:]
-            )
+                    if len(docstring_content) >= 10 and "code" not in docstring_content:
+                        docstring_content = docstring_content.replace("<cite>", "")
+                        docstring_content = docstring_content.replace("</cite>", "")
+                        token = "<p>" + link_docstring_calls(
+                            docstring_content, html_filepath
+                        )
+                        pos = docstring_end
+            else:
+                correction = "scan"
 
-    sub_str = '<dt class="field-odd">Parameters</dt>'
-    indices = [
-        i
-        for i in range(len(html_contents_modded))
-        if html_contents_modded.startswith(sub_str, i)
-    ]
-    for i in range(len(indices)):
-        code_str = '<code class="xref py py-class docutils literal notranslate"><span class="pre">'
-        if i == len(indices) - 1:
-            end = len(html_contents_modded)
-        else:
-            end = indices[i + 1]
-        code_indices = [
-            x
-            for x in range(indices[i], end)
-            if html_contents_modded.startswith(code_str, x)
-        ]
-        for j in range(len(code_indices)):
-            code_index = code_indices[j]
-            code_end = (
-                code_index + html_contents_modded[code_index:].find("</code>") + 7
+        elif kind == "paragraph_end":
+            supported_frameworks = 3
+
+        elif kind == "external_reference":
+            # Every external reference inside the paragraph gets the logo class
+            token += " logo"
+
+        elif kind == "prename":
+            # Update namespaces for inline code in documentation
+            namespace_end = html_contents.find("</span>", token_end)
+            if namespace_end == -1:
+                namespace_end = len(html_contents)
+            token += context.trim_namespace(
+                context.rewrite_text(html_contents[token_end:namespace_end])
             )
-            code = html_contents_modded[code_index:code_end]
-            if (
-                "_DeviceArray" in code
-                or "DeviceArray" in code
-                or "ndarray" in code
-                or "Tensor" in code
-            ):
-                if html_contents_modded[code_index - 2 : code_index] == ", ":
-                    code_index -= 2
-                html_contents_modded = (
-                    html_contents_modded[0:code_index]
-                    + '<doc-builder-tensor-placeholder>' * (code_end - code_index + 1)
-                    + html_contents_modded[code_end + 1 :]
+            pos = namespace_end
+
+        elif kind == "breadcrumbs":
+            breadcrumbs = 1
+
+        elif kind == "list_item":
+            last_li = len(pieces)
+            li_open = True
+
+        elif kind == "no_title":
+            breadcrumbs = 2
+
+        elif kind == "list_item_end":
+            li_open = False
+            if breadcrumbs == 2:
+                # the item is removed along with the line break after it
+                breadcrumbs = 3
+                del pieces[last_li:]
+                token = ""
+                pos = token_end + 1
+
+        elif kind == "list_end":
+            breadcrumbs = 3
+
+        elif kind == "sig_object":
+            if instance_methods:
+                line_end = html_contents.find("\n", token_start)
+                if line_end == -1:
+                    line_end = len(html_contents)
+                function_def = html_contents[token_start:line_end]
+                if "array_methods" in function_def or "container_methods" in function_def:
+                    pending_references.append(
+                        get_instance_method_extension(function_def, submodule_name)
+                    )
+                    pending_docstrings += 1
+
+        elif kind == "internal_reference":
+            # Point the source links of instance methods to their array and container pages
+            reference_end = html_contents.find('"><span', token_end)
+            if pending_references and reference_end != -1:
+                ref = context.rewrite_text(html_contents[token_end:reference_end])
+                new_ref_str = "_modules/ivy/"
+                token += (
+                    ref[0 : ref.find(new_ref_str) + len(new_ref_str)]
+                    + pending_references.pop(0)
                 )
+                pos = reference_end
+            else:
+                correction = "scan"
+
+        elif kind == "definition_list_end":
+            # docstrings are only searched inside the definition of the instance method
+            pending_docstrings = 0
+
+        elif kind == "parameters":
+            in_parameters = True
+
+        elif kind == "xref_code":
+            # Remove the type hint along with the separator before it and the character after it, in every parameters
+            # list of the page. Before the single scan offsets left stale by the earlier edits limited it to the first
+            code_end = html_contents.find("</code>", token_end)
+            if code_end != -1:
+                code = html_contents[token_start : code_end + 7]
+                if any(tensor_type in code for tensor_type in TENSOR_TYPES):
+                    remove_suffix(pieces, ", ")
+                    token = ""
+                    pos = code_end + 8
+
+        pieces.append(token)
+        if correction_times is not None:
+            seconds = time.perf_counter() - handler_start_time
+            handler_seconds += seconds
+            correction_times[correction] = correction_times.get(correction, 0.0) + seconds
+    pieces.append(html_contents[pos:])
+
+    if correction_times is not None:
+        # the time spent finding the markup of the corrections
+        correction_times["scan"] = (
+            correction_times.get("scan", 0.0)
+            + time.perf_counter()
+            - start_time
+            - handler_seconds
+        )
+    return "".join(pieces)
 
-    html_contents_modded = html_contents_modded.replace("<doc-builder-tensor-placeholder>", "")
-    with open(html_filepath, "w") as file:
-        file.write(html_contents_modded)
 
+def modify_html_file(html_filepath, context=None, correction_times=None):
+    # The seconds spent in every correction are added to correction_times when it is given.
+    # Returns the bytes written, so the page does not need to be read again to be hashed
+    if context is None:
+        context = load_rewrite_context()
 
-def modify_html_files(directory):
+    # Read markup generated by sphinx
+    with open(html_filepath, "rb") as file:
+        html_contents = file.read().decode("utf-8")
+
+    content = correct_page(
+        html_contents, html_filepath, context, correction_times
+    ).encode("utf-8")
+
+    with open(html_filepath, "wb") as file:
+        file.write(content)
+    return content
+
+
+def hash_file(file_path):
+    with open(file_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def list_html_files(directory):
     # List all files and folders in the build directory
     items_in_dir = os.listdir(directory)
 
     # Get paths of each file in the build directory
     paths = [os.path.join(directory, item) for item in items_in_dir]
 
-    # Recursively traverse all files
+    # Recursively collect all html files
+    html_filepaths = []
     for item in paths:
         if item[-5:] == ".html":
-            modify_html_file(item)
+            html_filepaths.append(item)
         elif os.path.isdir(item):
-            modify_html_files(item)
+            html_filepaths += list_html_files(item)
+    return html_filepaths
+
+
+def shard_html_files(html_filepaths, num_shards):
+    # Hand out the largest pages first, always to the shard with the least markup so far
+    shards = [[] for _ in range(num_shards)]
+    shard_sizes = [0] * num_shards
+    file_sizes = {path: os.path.getsize(path) for path in html_filepaths}
+    for path in sorted(html_filepaths, key=file_sizes.get, reverse=True):
+        index = shard_sizes.index(min(shard_sizes))
+        shards[index].append(path)
+        shard_sizes[index] += file_sizes[path]
+    return [shard for shard in shards if shard]
 
 
-# All html files have been already developed with sphinx build, this script is aimed at modifications to those files.
-modify_html_files("build")
-print("\nParsed and corrected built html files\n")
+def modify_html_shard(
+    html_filepaths, context, profile=False, profile_output=None, incremental=False
+):
+    # A page which cannot be corrected is recorded and skipped, so the rest of the shard still gets corrected.
+    # The hashes of the corrected pages are only returned for incremental corrections.
+    # When profiling, the time of every page and of its corrections is returned, and the cProfile stats of
+    # the shard are written next to profile_output, to be merged by the main process
+    start_time = time.perf_counter()
+    num_bytes, num_written_bytes = 0, 0
+    failures = []
+    page_times = dict()
+    corrected_hashes = dict()
+    profiler = None
+    if profile_output:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    for html_filepath in html_filepaths:
+        try:
+            num_bytes += os.path.getsize(html_filepath)
+            if profile:
+                correction_times = dict()
+                page_start_time = time.perf_counter()
+                content = modify_html_file(html_filepath, context, correction_times)
+                page_times[html_filepath] = (
+                    time.perf_counter() - page_start_time,
+                    correction_times,
+                )
+            else:
+                content = modify_html_file(html_filepath, context)
+            num_written_bytes += len(content)
+            if incremental:
+                corrected_hashes[html_filepath] = hashlib.sha256(content).hexdigest()
+        except Exception as e:
+            failures.append((html_filepath, "{}: {}".format(type(e).__name__, e)))
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats("{}.{}".format(profile_output, os.getpid()))
+    elapsed = time.perf_counter() - start_time
+    return (
+        os.getpid(),
+        len(html_filepaths),
+        num_bytes,
+        num_written_bytes,
+        elapsed,
+        failures,
+        page_times,
+        corrected_hashes,
+    )
+
+
+def print_profile(results, directory, top):
+    # The slowest pages with their slowest correction, then the time of every correction over all pages
+    page_times = dict()
+    for result in results:
+        page_times.update(result[-2])
+    correction_totals = dict()
+    correction_maxima = dict()
+    for _, correction_times in page_times.values():
+        for name, seconds in correction_times.items():
+            correction_totals[name] = correction_totals.get(name, 0.0) + seconds
+            correction_maxima[name] = max(correction_maxima.get(name, 0.0), seconds)
+    total = sum(seconds for seconds, _ in page_times.values())
+
+    print("\n{} slowest of {} pages:".format(min(top, len(page_times)), len(page_times)))
+    print("{:>10}  {:<28}{}".format("ms", "slowest correction", "page"))
+    slowest_pages = sorted(page_times.items(), key=lambda item: item[1][0], reverse=True)
+    for html_filepath, (seconds, correction_times) in slowest_pages[:top]:
+        slowest_correction = max(correction_times, key=correction_times.get)
+        print(
+            "{:>10.1f}  {:<28}{}".format(
+                seconds * 1e3,
+                "{} {:.1f}".format(
+                    slowest_correction, correction_times[slowest_correction] * 1e3
+                ),
+                os.path.relpath(html_filepath, directory),
+            )
+        )
+
+    print("\ncorrections:")
+    print("{:<28}{:>10}{:>8}{:>14}".format("", "total ms", "share", "max page ms"))
+    slowest_corrections = sorted(
+        correction_totals, key=correction_totals.get, reverse=True
+    )
+    for name in slowest_corrections[:top]:
+        print(
+            "{:<28}{:>10.1f}{:>7.1f}%{:>14.1f}".format(
+                name,
+                correction_totals[name] * 1e3,
+                100 * correction_totals[name] / total if total else 0.0,
+                correction_maxima[name] * 1e3,
+            )
+        )
+    print(
+        "{:<28}{:>10.1f}   (reading and writing the pages included)".format(
+            "all pages", total * 1e3
+        )
+    )
+
+
+def save_profile(results, profile_output):
+    # Merges the cProfile stats written by every shard into a single pstats file
+    shard_outputs = [
+        "{}.{}".format(profile_output, pid)
+        for pid in sorted(set(result[0] for result in results))
+    ]
+    shard_outputs = [path for path in shard_outputs if os.path.exists(path)]
+    if not shard_outputs:
+        return
+    stats = pstats.Stats(*shard_outputs)
+    stats.dump_stats(profile_output)
+    for path in shard_outputs:
+        os.remove(path)
+    print("\ncProfile stats of the corrections written to {}".format(profile_output))
+
+
+def modify_html_files(
+    directory, jobs=1, incremental=False, profile_top=0, profile_output=None
+):
+    all_html_filepaths = list_html_files(directory)
+
+    # Pages which sphinx did not write again since their last correction are already corrected
+    manifest_path = os.path.join(directory, CORRECTED_PAGES_MANIFEST)
+    corrected_pages = dict()
+    if incremental and os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            corrected_pages = json.load(f)
+    html_filepaths = all_html_filepaths
+    if incremental:
+        html_filepaths = [
+            path
+            for path in all_html_filepaths
+            if corrected_pages.get(os.path.relpath(path, directory)) != hash_file(path)
+        ]
+        print(
+            "{} html files unchanged since their last correction".format(
+                len(all_html_filepaths) - len(html_filepaths)
+            )
+        )
+
+    context = load_rewrite_context()
+    profile = profile_top > 0 or profile_output is not None
+    if profile_output is not None:
+        profile_output = os.path.abspath(profile_output)
+    if jobs <= 1:
+        results = [
+            modify_html_shard(
+                html_filepaths, context, profile, profile_output, incremental
+            )
+        ]
+    else:
+        shards = shard_html_files(html_filepaths, jobs)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(
+                executor.map(
+                    modify_html_shard,
+                    shards,
+                    [context] * len(shards),
+                    [profile] * len(shards),
+                    [profile_output] * len(shards),
+                    [incremental] * len(shards),
+                )
+            )
+
+    # Report the throughput of every worker along with the pages which failed
+    failures = []
+    for pid, num_files, num_bytes, num_written_bytes, elapsed, shard_failures, _, _ in results:
+        build_stats.record_read(num_bytes, num_files)
+        build_stats.record_write(num_written_bytes, num_files - len(shard_failures))
+        print(
+            "worker {}: {} files, {:.1f} MB in {:.2f}s ({:.1f} files/s)".format(
+                pid,
+                num_files,
+                num_bytes / 1e6,
+                elapsed,
+                num_files / elapsed if elapsed else 0.0,
+            )
+        )
+        failures += shard_failures
+    for html_filepath, error in failures:
+        print("failed to correct {}: {}".format(html_filepath, error))
+    if profile:
+        print_profile(results, directory, profile_top or 10)
+    if profile_output is not None:
+        save_profile(results, profile_output)
+
+    # Record the corrected pages for the next incremental correction, dropping the ones which no longer exist.
+    # A full correction leaves no record, the pages of an earlier record may have been written again since
+    if not incremental:
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        return failures
+    all_pages = set(os.path.relpath(path, directory) for path in all_html_filepaths)
+    corrected_pages = {
+        page: page_hash
+        for page, page_hash in corrected_pages.items()
+        if page in all_pages
+    }
+    for result in results:
+        for path, page_hash in result[-1].items():
+            corrected_pages[os.path.relpath(path, directory)] = page_hash
+    with open(manifest_path, "w") as f:
+        json.dump(corrected_pages, f, indent=1, sort_keys=True)
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--build_dir",
+        type=str,
+        default="build",
+        help="Folder of the built html files.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes correcting the built html files, 0 uses all cores.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only correct the html files written by sphinx since the last correction.",
+    )
+    parser.add_argument(
+        "--stats",
+        type=str,
+        help="JSON report the time and resources of the corrections are added to.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Time every page and every correction, and print the N slowest pages and corrections.",
+    )
+    parser.add_argument(
+        "--profile_output",
+        type=str,
+        help="pstats file the cProfile stats of the corrections are written to, implies --profile.",
+    )
+    parsed_args = parser.parse_args()
+    if parsed_args.stats:
+        build_stats.start(parsed_args.stats, "correct_built_html_files")
+
+    # All html files have been already developed with sphinx build, this script is aimed at modifications to those files.
+    with build_stats.measure("modify_html_files"):
+        failures = modify_html_files(
+            parsed_args.build_dir,
+            parsed_args.jobs or os.cpu_count(),
+            parsed_args.incremental,
+            parsed_args.profile,
+            parsed_args.profile_output,
+        )
+    if failures:
+        print("\nFailed to correct {} built html files\n".format(len(failures)))
+        sys.exit(1)
+    print("\nParsed and corrected built html files\n")
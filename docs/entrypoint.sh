@@ -5,14 +5,8 @@ IFS='/' read -r -a working_directory <<< "$PWD"
 user="${working_directory[2]}"
 cd "/home/$user/project" || exit
 
-# installing requirements
-pip3 install -r requirements/requirements.txt || exit 1
-if [[ -f requirements/optional.txt ]]
-then
-    pip3 install torch==1.11.0
-    pip3 install torch-scatter==2.0.9
-    pip3 install -r requirements/optional.txt || exit 1
-fi
+# installing requirements, skipped when the image already has the same requirements installed, see Dockerfile.project
+WHEELHOUSE="${WHEELHOUSE:-/home/$user/wheelhouse}" bash /home/"$user"/global_docs/install_requirements.sh . || exit 1
 
 # moving to the docs folder
 cd "docs" || exit
@@ -20,8 +14,15 @@ cd "docs" || exit
 # syncing current folder with the container's result folder to get results in this folder
 rsync -rav /home/"$user"/global_docs/* . || exit 1
 
+# reuse the sphinx environment of previous builds when a cache directory is given
+cache_args=()
+if [[ -n "$DOCS_CACHE_DIR" ]]
+then
+    mkdir -p "$DOCS_CACHE_DIR" && cache_args=("--cache_dir" "$DOCS_CACHE_DIR")
+fi
+
 # generate the documentation
-./_make_docs.sh "$@"
+./_make_docs.sh "$@" "${cache_args[@]}"
 
 # delete the code
 ./remove_files.sh
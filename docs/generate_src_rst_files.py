@@ -2,22 +2,89 @@
 # It is used to generate files with content using code that can be used by the sphinx builder to create pages
 
 import os
+import re
 import string
 import shutil
+import fnmatch
+import filecmp
 import argparse
 import json
+import hashlib
 import logging
+from concurrent.futures import ProcessPoolExecutor
+import build_stats
+from module_scanner import (
+    scan_module,
+    read_module,
+    scan_directory,
+    add_module,
+    scan_imports,
+    get_signature,
+    drop_first_parameter,
+)
+from output_tree import OutputTree
 try:
-    # from supported_devices import get_flags
-    get_flags = lambda x: ((), False)
+    import supported_devices
+    from supported_devices import get_flags
 except (ImportError, ModuleNotFoundError) as e:
-    logging.warning("supported_device.py does not exist")
+    logging.warning("supported_devices.py could not be imported, {}".format(e))
+    supported_devices = None
+    get_flags = lambda x: ((), False)
 
 # These directories are not explored recursively while generating content for it.
 EXCLUDED_MODULES = ["exceptions", "library_getter", "setup", "__init__"]
 EXCLUDED_DIRS = [".pytest_cache", "docs", "tests", "__pycache__"]
 ARRAY_CONTAINER_SUBMODULES_TO_SKIP = ["container", "wrapping"]
 
+# Modules generated for the array and container methods, these are not inputs of the generation.
+# They are kept in memory and written to the _stubs folder of the generated content, from where conf.py imports them,
+# any files with these names in the repository are ignored.
+GENERATED_MODULES = ["array_methods.py", "container_methods.py"]
+STUBS_DIR = "autogenerated_source/_stubs"
+
+# In ivy, the array and container folders are documented below the data_classes folder. Their pages and the page of
+# the stateful folder present the classes, with the title and the module of every folder.
+DATA_CLASSES_DIR = "data_classes"
+DATA_CLASSES = ["array", "container"]
+CLASS_PAGES = {
+    "array": ("Array", "ivy.Array"),
+    "container": ("Container", "ivy.Container"),
+    "stateful": ("Framework Classes", "ivy.stateful"),
+}
+
+# With --mock_imports, these frameworks and the packages of the optional requirements of the project are mocked by
+# autodoc when the documented modules import them, and the signatures of the documented functions are read from
+# _signatures.json, which is found without importing the modules, whenever autodoc cannot find them itself
+MOCKED_FRAMEWORKS = [
+    "jax",
+    "jaxlib",
+    "mxnet",
+    "tensorflow",
+    "tensorflow_probability",
+    "torch",
+    "torch_scatter",
+]
+OPTIONAL_REQUIREMENTS_PATH = "../requirements/optional.txt"
+SIGNATURES_PATH = "autogenerated_source/_signatures.json"
+
+# Packages which are imported with another name than the one they are installed with
+IMPORT_NAMES = {
+    "dm-haiku": "haiku",
+    "opencv-python": "cv2",
+    "pillow": "PIL",
+    "pyyaml": "yaml",
+    "scikit-image": "skimage",
+    "scikit-learn": "sklearn",
+}
+
+# Content hashes of all inputs of the last generation, used for incremental builds
+MANIFEST_PATH = ".generation_manifest.json"
+
+# Partial builds given with --only are written to these folders instead of autogenerated_source and build,
+# so that the content and the pages of the full builds are kept for the next incremental build
+ONLY_SOURCE_DIR = "autogenerated_source_only"
+ONLY_BUILD_DIR = "build_only"
+
 THIS_DIR = ""
 SUBMODULE_TITLE = ""
 ROOT_DIR = ""
@@ -26,6 +93,20 @@ SUBMODS_TO_SKIP = list()
 SUBMODS_TO_STEP = list()
 IVY_ONLY = False
 
+# All content is generated into this tree of files, and written to the autogenerated_source folder at the end
+OUTPUT_TREE = None
+
+# Sub directories of the root which were generated by worker processes, with the sub directories and modules they contain
+GENERATED_SUBTREES = dict()
+
+# The code of every generated module by its path in the repository, as the list of parts added for every module
+GENERATED_CODE = dict()
+
+# The scope of a partial build given with --only, both None in full builds. The paths of the selected pages in
+# autogenerated_source without .rst, and the glob patterns of the selected names of pages and of documented objects.
+ONLY_DOC_PATHS = None
+ONLY_NAME_PATTERNS = None
+
 DISCORD_URL = "https://discord.com/channels/799879767196958751/"
 
 DISCUSSION_MSG =  (".. _`discord`: https://discord.gg/ZVQdvbzNQJ \n" 
@@ -69,12 +150,11 @@ def write_discussion_links():
             fpath = "autogenerated_source/" + module + "/" + submodule + ".rst"
             discord_channel_url = DISCORD_URL  + submodules[submodule][0]
             discord_forum_url = DISCORD_URL + submodules[submodule][1]
-            with open(fpath, "a") as rst_file:
-                rst_file.write(DISCUSSION_MSG.format(
-                    submodule_name=submodule.replace('_', ' '),
-                    discord_forum_link=discord_forum_url,
-                    discord_channel_link=discord_channel_url
-                ))
+            OUTPUT_TREE.append(fpath, DISCUSSION_MSG.format(
+                submodule_name=submodule.replace('_', ' '),
+                discord_forum_link=discord_forum_url,
+                discord_channel_link=discord_channel_url
+            ))
 
 def remove_absolute_img_links(readme_contents):
     lines = readme_contents.split("\n")
@@ -129,8 +209,7 @@ def create_index_rst(sub_contents_dict):
 
     all_data = prepend_data + "\n" + readme_contents + "\n" + append_data
 
-    with open("autogenerated_source/index.rst", "w+") as file:
-        file.write(all_data)
+    OUTPUT_TREE.write("autogenerated_source/index.rst", all_data)
 
     # toctree dict
     toctree_dict = dict()
@@ -149,22 +228,62 @@ def create_index_rst(sub_contents_dict):
     with open(os.path.join(THIS_DIR, "ivy_modules.txt"), "r") as f:
         module_names = [line.replace("\n", "") for line in f.readlines()]
 
+    if IVY_ONLY:
+        toctree_dict = add_class_toctrees(toctree_dict)
+
     toctree_dict["docs"] = [mod_name + ".rst" for mod_name in module_names]
-    os.makedirs("autogenerated_source/docs", exist_ok=True)
+    OUTPUT_TREE.makedirs("autogenerated_source/docs")
     for fname in toctree_dict["docs"]:
-        with open("autogenerated_source/docs/{}".format(fname), "w+") as file:
-            title_str = fname[:-4].replace("_", " ").capitalize()
-            file.write(title_str + "\n" + "=" * len(title_str))
+        title_str = fname[:-4].replace("_", " ").capitalize()
+        OUTPUT_TREE.write(
+            "autogenerated_source/docs/{}".format(fname),
+            title_str + "\n" + "=" * len(title_str),
+        )
 
     # append toctree
-    append_toctree_to_rst(toctree_dict, "autogenerated_source/index.rst")
+    append_toctree_to_rst(
+        toctree_dict,
+        "autogenerated_source/index.rst",
+        captions={"data_classes": "Data Classes", "stateful": "Framework Classes"},
+    )
 
 
-def append_toctree_to_rst(toctree_dict, rst_path, caption=None, newlines=True):
+def add_class_toctrees(toctree_dict):
+    # The data classes and the framework classes follow the functions in the index, instead of their folders
+    class_toctree_dict = dict()
+    for key, value in toctree_dict.items():
+        if key in CLASS_PAGES:
+            continue
+        class_toctree_dict[key] = value
+        if key == "functional":
+            class_toctree_dict["data_classes"] = sorted(
+                data_class + ".rst" for data_class in DATA_CLASSES
+            )
+            class_toctree_dict["stateful"] = [
+                file
+                for file in OUTPUT_TREE.listdir("autogenerated_source/stateful")
+                if ".rst" in file
+            ]
+    return class_toctree_dict
+
+
+def get_doc_path(rel_path):
+    # The path in autogenerated_source of the content generated for a path relative to the root directory
+    if IVY_ONLY and rel_path.split("/")[0] in DATA_CLASSES:
+        rel_path = os.path.join(DATA_CLASSES_DIR, rel_path)
+    return os.path.join("autogenerated_source", rel_path)
+
+
+def append_toctree_to_rst(
+    toctree_dict, rst_path, caption=None, newlines=True, captions=None
+):
     # appends the rst files generated for a module in module_name.rst
+    # captions can give the caption of some of the keys, the others use caption or their key
     str_to_write = "\n"
     for key, list_of_rsts in toctree_dict.items():
         cap = key.capitalize().replace("_", " ") if caption is None else caption
+        if captions is not None and key in captions:
+            cap = captions[key]
 
         # New headings
         # Functional --> Functions
@@ -185,20 +304,28 @@ def append_toctree_to_rst(toctree_dict, rst_path, caption=None, newlines=True):
         str_to_write = str_to_write.lstrip("\n")
         str_to_write += "\n"
 
-    with open(rst_path, "a") as file:
-        file.write(str_to_write)
+    OUTPUT_TREE.append(rst_path, str_to_write)
+
+def copy_image(src, dst):
+    # Copies an image into the build folder unless it is there already. The file is replaced instead of written to,
+    # it may be a link to the stored copy of the image, see asset_store.py
+    if os.path.exists(dst) and filecmp.cmp(src, dst, shallow=False):
+        return dst
+    shutil.copy2(src, dst + ".tmp")
+    os.replace(dst + ".tmp", dst)
+    return dst
+
 
 def copy_readme_to_rst(readme_path, rst_path):
     # copy data from README.rst to module_name.rst
     with open(readme_path) as file:
         readme_contents = file.read()
-    with open(rst_path, "w+") as file:
-        file.write(readme_contents)
+    OUTPUT_TREE.write(rst_path, readme_contents)
 
 
-def add_array_and_container_code(module_str, module_path, dotted_namespace):
+def add_array_and_container_code(module_symbols, module_path, dotted_namespace):
     folder = module_path[0 : module_path.rfind("/")]
-    content = module_str.split("\n")
+    content = module_symbols.lines
 
     # Find setup statements
     setup_statements = []
@@ -222,83 +349,63 @@ def add_array_and_container_code(module_str, module_path, dotted_namespace):
     else:
         return
 
-    # Append file
-    with open(file, "a") as f:
-        # Add submodule name at the top of file
-        f.write("#{}\n".format(dotted_namespace))
-
-        # Add setup statements to the file
-        for line in setup_statements:
-            f.write("{}\n".format(line))
-
-        # Add function signature and docstrings
-        find_def, find_docstring, done, inside_nest = True, False, False, False
-        i = 0
-        while i < len(content):
-            line = content[i]
-            line = line.strip("\n")
-
-            # Find function signature
-            if find_def:
-                if line[0:8] == "    def " and not inside_nest:
-                    while (
-                        "):" not in line
-                        and "ivy.Array:" not in line
-                        and "ivy.Container:" not in line
-                    ):
-                        f.write("{}\n".format(line[4:]))
-                        i += 1
-                        if i == len(content):
-                            return
-                        line = content[i]
-                    f.write("{}\n".format(line[4:]))
-                    i += 1
-                    find_docstring = True
-                    find_def = False
-                elif line[0:4] == "def ":
-                    i += 1
-                    inside_nest = True
-                    continue
-                else:
-                    i += 1
-                    continue
-
-            # Find docstring
-            elif find_docstring:
-                if "'''" in line or '"""' in line:
-                    f.write("{}\n".format(line[4:]))
-                    i += 1
-                    if i == len(content):
-                        return
-                    line = content[i]
-                    while "'''" not in line and '"""' not in line:
-                        f.write("{}\n".format(line[4:]))
-                        i += 1
-                        if i == len(content):
-                            return
-                        line = content[i]
-                    f.write("{}\n".format(line[4:]))
-                    find_docstring = False
-                    done = True
-                else:
-                    i += 1
-                    f.write("    pass\n\n\n")
-                    find_def, find_docstring, done = True, False, False
+    # Add submodule name at the top of the code
+    code = ["#{}\n".format(dotted_namespace)]
+
+    # Add setup statements to the code
+    for line in setup_statements:
+        code.append("{}\n".format(line))
+
+    # Add every method as a function with the same signature and docstring
+    for class_symbol in module_symbols.classes:
+        for method in class_symbol.methods:
+            # Methods defined on the same line as their body are skipped
+            if method.body_lineno == method.lineno:
+                continue
+            def_line = content[method.lineno - 1]
+            indent = len(def_line) - len(def_line.lstrip())
+
+            # Add function signature
+            for line in content[method.lineno - 1 : method.body_lineno - 1]:
+                code.append("{}\n".format(line[indent:]))
+
+            # Add docstring
+            if method.docstring_lines is not None:
+                first_line, last_line = method.docstring_lines
+                for line in content[first_line - 1 : last_line]:
+                    code.append("{}\n".format(line[indent:]))
 
             # Add pass to the end of each function
-            elif done:
-                i += 1
-                if not inside_nest:
-                    f.write("    pass\n\n\n")
-                find_def, find_docstring, done, inside_nest = True, False, False, False
-            else:
-                i += 1
+            code.append("    pass\n\n\n")
+
+    # The code is appended to the generated module in memory
+    GENERATED_CODE.setdefault(file, []).append("".join(code))
+    return file
+
+
+def get_generated_code(module_path):
+    return "".join(GENERATED_CODE.get(module_path, []))
+
+
+def scan_generated_modules():
+    # The symbol tables of the generated modules are found from their code in memory
+    for module_path in GENERATED_CODE:
+        scan_module(module_path, get_generated_code(module_path))
+
+
+def write_generated_modules():
+    # The generated modules are imported by sphinx from the _stubs folder under their module name, see conf.py
+    for module_path in GENERATED_CODE:
+        stub_path = os.path.join(
+            STUBS_DIR, os.path.relpath(module_path, os.path.dirname(ROOT_DIR))
+        )
+        OUTPUT_TREE.makedirs(os.path.dirname(stub_path))
+        OUTPUT_TREE.write(stub_path, get_generated_code(module_path))
 
 
-def add_instance_and_static_methods(directory):
-    # get contents of directory, here directory refers to the ivy directory
-    contents = os.listdir(directory)
-    contents.sort()
+def add_instance_and_static_methods(source_dir):
+    # source_dir is the model of a directory found by scan_directory, here the ivy directory
+    directory = source_dir.path
 
     # save dir in docs
     repo_name = ROOT_DIR.split("/")[-1]
@@ -307,29 +414,16 @@ def add_instance_and_static_methods(directory):
 
     name_len_p1 = len(repo_name) + 1
 
-    # represent as file-paths
-    cont_paths = [os.path.join(directory, item) for item in contents]
-
-    # Get all sub-directories inside the directory which are not to be excluded
-    sub_dirs = [
-        item
-        for item in cont_paths
-        if os.path.isdir(item) and item.split("/")[-1] not in EXCLUDED_DIRS
-    ]
-
-    # Recursively access all sub-directories,
-    # and store the list of sub directories and sub modules for that directory in the dictionary
-    for sub_dir in sub_dirs:
-        if sub_dir in [os.path.join(ROOT_DIR, sts) for sts in SUBMODS_TO_SKIP]:
+    # Recursively access all sub-directories which are not skipped
+    for sub_dir in source_dir.sub_dirs:
+        if sub_dir not in source_dir.children:
             continue
-        add_instance_and_static_methods(sub_dir)
+        if sub_dir in GENERATED_SUBTREES:
+            continue
+        add_instance_and_static_methods(source_dir.children[sub_dir])
 
-    # Extract python modules which are not to be excluded
-    modules = [
-        item
-        for item in cont_paths
-        if item[-3:] == ".py" and item.split("/")[-1][:-3] not in EXCLUDED_MODULES
-    ]
+    # Modules generated while adding the methods are not added to themselves
+    modules = list(source_dir.modules)
 
     for module in modules:
 
@@ -346,39 +440,33 @@ def add_instance_and_static_methods(directory):
                 module[repo_location:-3].split("/")[0 : i + 3]
             ).replace("/", ".")
 
-        with open(module, errors="replace") as file:
-            module_str = file.read()
-
-        index = module_str.find("\n    def ")
-        if index != -1:
-            add_array_and_container_code(module_str, module, dotted_namespace)
+        module_symbols = scan_module(module)
+        if any(class_symbol.methods for class_symbol in module_symbols.classes):
+            file = add_array_and_container_code(
+                module_symbols, module, dotted_namespace
+            )
+            if file is not None:
+                add_module(source_dir, file)
 
 
 def get_functions_and_classes(module_path, dotted_namespace):
-    # This function finds all classes and functions in a module using 'class' and 'def' keywords
-    with open(module_path, errors="replace") as file:
-        module_str = file.read()
-    all_function_names = [
-        dotted_namespace + "." + item.split("(")[0]
-        for item in module_str.split("\ndef ")[1:]
-    ]
+    # This function finds all classes and functions defined at the module level, using the symbol table of the module
+    module_symbols = scan_module(module_path)
     public_function_names = [
-        n for n in all_function_names if n.split(".")[-1][0] != "_"
+        dotted_namespace + "." + symbol.name
+        for symbol in module_symbols.functions
+        if symbol.name[0] != "_"
     ]
     class_names = [
-        dotted_namespace + "." + item.split("(")[0]
-        for item in module_str.split("\nclass ")[1:]
+        dotted_namespace + "." + symbol.name for symbol in module_symbols.classes
     ]
     return public_function_names, class_names
 
 
-def create_rst_files(directory):
-    # get contents of directory, here directory refers to the ivy directory
-    contents = os.listdir(directory)
-    contents.sort()
-
-    # represent as file-paths
-    cont_paths = [os.path.join(directory, item) for item in contents]
+def create_rst_files(source_dir):
+    # source_dir is the model of a directory found by scan_directory, here the ivy directory
+    directory = source_dir.path
+    contents = source_dir.names
 
     # save dir in docs
     repo_name = ROOT_DIR.split("/")[-1]
@@ -393,32 +481,27 @@ def create_rst_files(directory):
     )
 
     # Creating a folder with that name inside autogenerated_source
-    os.makedirs(os.path.dirname(doc_save_dir), exist_ok=True)
+    OUTPUT_TREE.makedirs(os.path.dirname(doc_save_dir))
 
-    # Get all sub-directories inside the directory which are not to be excluded
-    sub_dirs = [
-        item
-        for item in cont_paths
-        if os.path.isdir(item) and item.split("/")[-1] not in EXCLUDED_DIRS
-    ]
+    # All sub-directories inside the directory which are not to be excluded
+    sub_dirs = source_dir.sub_dirs
 
     # Dictionary to store all submodules for which rst files are generated
     sub_contents = dict()
 
-    # Recursively access all sub-directories,
+    # Recursively access all sub-directories which are not skipped,
     # and store the list of sub directories and sub modules for that directory in the dictionary
     for sub_dir in sub_dirs:
-        if sub_dir in [os.path.join(ROOT_DIR, sts) for sts in SUBMODS_TO_SKIP]:
+        if sub_dir not in source_dir.children:
             continue
-        sub_sub_dirs, sub_modules = create_rst_files(sub_dir)
+        if sub_dir in GENERATED_SUBTREES:
+            sub_sub_dirs, sub_modules = GENERATED_SUBTREES[sub_dir]
+        else:
+            sub_sub_dirs, sub_modules = create_rst_files(source_dir.children[sub_dir])
         sub_contents[sub_dir] = sub_sub_dirs + sub_modules
 
-    # Extract python modules which are not to be excluded
-    modules = [
-        item
-        for item in cont_paths
-        if item[-3:] == ".py" and item.split("/")[-1][:-3] not in EXCLUDED_MODULES
-    ]
+    # All python modules which are not to be excluded
+    modules = source_dir.modules
     # get classes and functions for these modules
     for module in modules:
 
@@ -437,10 +520,7 @@ def create_rst_files(directory):
             # create directory structure for this module
             # Every module will be represented by a folder which will contain rst files for all its functions and
             # an rst file which will use all rst files in that folder to generate the overall markup
-            new_filepath = (
-                os.path.join("autogenerated_source", rel_path).replace(".py", "")
-                + ".rst"
-            )
+            new_filepath = get_doc_path(rel_path).replace(".py", "") + ".rst"
 
             # Dotted namespace
             dotted_namespace = "/".join(
@@ -451,24 +531,22 @@ def create_rst_files(directory):
             module_name = dotted_namespace.split(".")[-1]
             module_title = module_name.replace("_", " ")
 
-            new_module_dir = os.path.join("autogenerated_source", rel_path).replace(
-                ".py", ""
-            )
-            os.makedirs(new_module_dir, exist_ok=True)
+            new_module_dir = get_doc_path(rel_path).replace(".py", "")
+            OUTPUT_TREE.makedirs(new_module_dir)
 
             # writing the rst file for each module
-            with open(new_filepath, "w+") as file:
-                file.write(
-                    (module_title).capitalize()
-                    + "\n"
-                    + "=" * len(module_title)
-                    + "\n\n"
-                    ".. automodule:: " + dotted_namespace + "\n"
-                    "    :members:\n"
-                    "    :special-members: __init__\n"
-                    "    :undoc-members:\n"
-                    "    :show-inheritance:\n"
-                )
+            OUTPUT_TREE.write(
+                new_filepath,
+                (module_title).capitalize()
+                + "\n"
+                + "=" * len(module_title)
+                + "\n\n"
+                ".. automodule:: " + dotted_namespace + "\n"
+                "    :members:\n"
+                "    :special-members: __init__\n"
+                "    :undoc-members:\n"
+                "    :show-inheritance:\n",
+            )
 
         # Get all function and class names in the module
         # The dotted namespace helps generate fully qualified class and function names
@@ -506,35 +584,36 @@ def create_rst_files(directory):
             if IVY_ONLY:
                 flags, valid = get_flags(func_name)
                 if valid:
-                    table = DEVICE_SUPPORT_STR.format(*flags)
-            with open(function_filepath, "w+") as file:
-                file.write(
-                    func_name
-                    + extension
-                    + "\n"
-                    + "=" * len(func_name + extension)
-                    + "\n\n"
-                    ".. autofunction:: "
-                    + dotted_func
-                    + "\n"
-                    + supported_fw_str
-                )
+                    table = DEVICE_SUPPORT_STR.format(*flags) + "\n"
+            OUTPUT_TREE.write(
+                function_filepath,
+                func_name
+                + extension
+                + "\n"
+                + "=" * len(func_name + extension)
+                + "\n\n"
+                ".. autofunction:: "
+                + dotted_func
+                + "\n"
+                + table
+                + supported_fw_str,
+            )
 
         # Write class rst files
         for class_name, dotted_class in zip(class_names, classes):
             class_filepath = os.path.join(new_module_dir, class_name) + ".rst"
-            with open(class_filepath, "w+") as file:
-                file.write(
-                    class_name + "\n" + "=" * len(class_name) + "\n\n"
-                    ".. autoclass:: "
-                    + dotted_class
-                    + "\n"
-                    + "   :members:\n"
-                    + "   :special-members: __init__\n"
-                    + "   :undoc-members:\n"
-                    + "   :show-inheritance:\n"
-                    + supported_fw_str
-                )
+            OUTPUT_TREE.write(
+                class_filepath,
+                class_name + "\n" + "=" * len(class_name) + "\n\n"
+                ".. autoclass:: "
+                + dotted_class
+                + "\n"
+                + "   :members:\n"
+                + "   :special-members: __init__\n"
+                + "   :undoc-members:\n"
+                + "   :show-inheritance:\n"
+                + supported_fw_str,
+            )
 
     # README.rst is the main file which represents the overall folder for which documentation is generated
     if "README.rst" in contents or directory in [
@@ -568,8 +647,30 @@ def create_rst_files(directory):
         toctree_dict = {toctree_key: toctree_key_values}
         append_toctree_to_rst(toctree_dict, rst_path)
 
+    # In ivy, the folders of the classes are presented by their class pages, written once the folder is complete
+    rel_dir = directory[repo_location + name_len_p1 :]
+    if IVY_ONLY and rel_dir in CLASS_PAGES:
+        title, module_name = CLASS_PAGES[rel_dir]
+        write_header_and_toctree_to_rst(
+            get_doc_path(rel_dir),
+            get_doc_path(rel_dir) + ".rst",
+            title,
+            module_name,
+            rel_dir,
+        )
+
     # Used to create index.rst
     if directory == ROOT_DIR:
+        if IVY_ONLY:
+            data_classes_path = os.path.join("autogenerated_source", DATA_CLASSES_DIR)
+            OUTPUT_TREE.makedirs(data_classes_path)
+            write_header_and_toctree_to_rst(
+                data_classes_path,
+                data_classes_path + ".rst",
+                "Data Classes",
+                "ivy.data_classes",
+                DATA_CLASSES_DIR,
+            )
         if SUBMODULE_TITLE is not None:
             create_index_rst({"": modules})
         else:
@@ -578,26 +679,169 @@ def create_rst_files(directory):
     return sub_dirs, modules
 
 
+def init_generation_worker(settings, support_matrix):
+    # Worker processes start with the settings read by main
+    global THIS_DIR, ROOT_DIR, SUBMODULE_TITLE, SUBMOD_ORDERS, SUBMODS_TO_SKIP, SUBMODS_TO_STEP, IVY_ONLY
+    global ONLY_DOC_PATHS, ONLY_NAME_PATTERNS
+    (
+        THIS_DIR,
+        ROOT_DIR,
+        SUBMODULE_TITLE,
+        SUBMOD_ORDERS,
+        SUBMODS_TO_SKIP,
+        SUBMODS_TO_STEP,
+        IVY_ONLY,
+        ONLY_DOC_PATHS,
+        ONLY_NAME_PATTERNS,
+    ) = settings
+    if supported_devices is not None:
+        # the flags were found by main before the generation, functions without them have no flags
+        supported_devices.SUPPORT_MATRIX.update(support_matrix)
+        supported_devices.PROBE_ON_MISS = False
+
+
+def generate_subtree(source_dir, tree):
+    # Generates the content of a sub directory of the root in a worker process, into a tree holding only its paths
+    global OUTPUT_TREE, GENERATED_CODE
+    OUTPUT_TREE = tree
+    GENERATED_CODE = dict()
+    io_counts = dict(build_stats.IO_COUNTS)
+    if IVY_ONLY:
+        add_instance_and_static_methods(source_dir)
+        scan_generated_modules()
+    sub_sub_dirs, sub_modules = create_rst_files(source_dir)
+    return (
+        sub_sub_dirs,
+        sub_modules,
+        OUTPUT_TREE,
+        GENERATED_CODE,
+        build_stats.get_io_counts_since(io_counts),
+    )
+
+
+def get_source_directory(source_dir, path):
+    # The model of the directory at path, which is source_dir or below it
+    while source_dir.path != path:
+        source_dir = next(
+            child
+            for child_path, child in source_dir.children.items()
+            if path == child_path or path.startswith(child_path + os.sep)
+        )
+    return source_dir
+
+
+def generate_subtrees_in_parallel(source_dir, jobs):
+    # The sub directories of the root are independent of each other until the index is created,
+    # so each of them is generated by a worker process and merged in the order of the serial generation
+    sub_dirs = [
+        sub_dir for sub_dir in source_dir.sub_dirs if sub_dir in source_dir.children
+    ]
+    support_matrix = dict()
+    if supported_devices is not None and IVY_ONLY:
+        support_matrix = supported_devices.SUPPORT_MATRIX
+    settings = (
+        THIS_DIR,
+        ROOT_DIR,
+        SUBMODULE_TITLE,
+        SUBMOD_ORDERS,
+        SUBMODS_TO_SKIP,
+        SUBMODS_TO_STEP,
+        IVY_ONLY,
+        ONLY_DOC_PATHS,
+        ONLY_NAME_PATTERNS,
+    )
+
+    # The paths written for a sub directory are its folder and its rst file,
+    # and the folder and the class page of a data class, which are kept below the data classes folder
+    subtree_paths = dict()
+    for sub_dir in sub_dirs:
+        doc_save_dir = os.path.join("autogenerated_source", os.path.basename(sub_dir))
+        subtree_paths[sub_dir] = [doc_save_dir, doc_save_dir + ".rst"]
+        doc_path = get_doc_path(os.path.basename(sub_dir))
+        if doc_path != doc_save_dir:
+            subtree_paths[sub_dir] += [doc_path, doc_path + ".rst"]
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=init_generation_worker,
+        initargs=(settings, support_matrix),
+    ) as executor:
+        futures = [
+            executor.submit(
+                generate_subtree,
+                source_dir.children[sub_dir],
+                OUTPUT_TREE.subtree(subtree_paths[sub_dir]),
+            )
+            for sub_dir in sub_dirs
+        ]
+        for sub_dir, future in zip(sub_dirs, futures):
+            (
+                sub_sub_dirs,
+                sub_modules,
+                tree,
+                generated_code,
+                io_counts,
+            ) = future.result()
+            inside_files = tree.subtree(subtree_paths[sub_dir]).files
+            outside_paths = [key for key in tree.files if key not in inside_files]
+            if outside_paths:
+                raise RuntimeError(
+                    "{} was generated outside of its folder: {}".format(
+                        sub_dir, ", ".join(outside_paths)
+                    )
+                )
+            OUTPUT_TREE.update(tree, subtree_paths[sub_dir])
+            GENERATED_SUBTREES[sub_dir] = (sub_sub_dirs, sub_modules)
+            GENERATED_CODE.update(generated_code)
+            # The modules generated by the worker were added to its copy of the directory model only
+            for module_path in generated_code:
+                add_module(
+                    get_source_directory(source_dir, os.path.dirname(module_path)),
+                    module_path,
+                )
+            build_stats.add_io_counts(io_counts)
+
+
+def index_method_submodules(code):
+    # Maps every function defined in the generated code to the submodule of its first definition,
+    # which is named by the last "#ivy." line before it
+    method_submodules = dict()
+    submodule_name = None
+    for match in re.finditer(r"#ivy\.|def ([A-Za-z_]\w*)\(", code):
+        if match.group(1) is None:
+            line_end = code.find("\n", match.start())
+            if line_end == -1:
+                line_end = len(code)
+            submodule_name = code[match.start() : line_end].split(".")[-1]
+        elif match.group(1) not in method_submodules and submodule_name is not None:
+            method_submodules[match.group(1)] = submodule_name
+    return method_submodules
+
+
 def append_instance_content_to_rst(
-    function_type, path, files, file_str, functional_path
+    function_type, path, files, code, functional_path, functional_rsts
 ):
+    # functional_rsts holds the lines of the functional rst files which were read, by their path
+    method_submodules = index_method_submodules(code)
+
+    # The rst files in every submodule folder of the functional api, None if the folder does not exist
+    submodule_rsts = dict()
+
     functions = []
     for file in files:
         # Read array rst
-        with open(os.path.join(path, file), "r") as f:
-            rst_content = f.readlines()
-            function_line = [
-                line for line in rst_content if ".. autofunction::" in line
-            ]
-            if len(function_line) == 0:
-                continue
-            function_line = function_line[0]
+        rst_content = OUTPUT_TREE.readlines(os.path.join(path, file))
+        function_line = [line for line in rst_content if ".. autofunction::" in line]
+        if len(function_line) == 0:
+            continue
+        function_line = function_line[0]
 
         function_name = (function_line.strip("\n").split(" ")[2]).split(".")[-1]
 
-        function_index = file_str.find("def {}(".format(function_name))
-        submodule_index = file_str[0 : function_index + 1].rfind("#ivy.")
-        submodule_name = (file_str[submodule_index:].split("\n")[0]).split(".")[-1]
+        # Functions which are not defined after a submodule line belong to the name after the last dot of the code
+        submodule_name = method_submodules.get(
+            function_name, (code[-1:].split("\n")[0]).split(".")[-1]
+        )
 
         raw_function_name = str(function_name)
         if function_name.split("_")[0] == "static":
@@ -608,66 +852,66 @@ def append_instance_content_to_rst(
 
         submodule_path = os.path.join(functional_path, submodule_name)
 
-        if not os.path.exists(submodule_path):
+        if submodule_path not in submodule_rsts:
+            submodule_rsts[submodule_path] = None
+            if OUTPUT_TREE.exists(submodule_path):
+                submodule_rsts[submodule_path] = set(
+                    OUTPUT_TREE.listdir(submodule_path)
+                )
+        if submodule_rsts[submodule_path] is None:
             continue
 
-        function_file = [
-            file
-            for file in os.listdir(submodule_path)
-            if file == "{}.rst".format(function_name)
-        ]
-
-        if len(function_file) == 0:
+        function_file = "{}.rst".format(function_name)
+        if function_file not in submodule_rsts[submodule_path]:
             continue
-        
-        function_file = function_file[0]
 
         function_dir = os.path.join(submodule_path, function_name)
-        os.makedirs(function_dir, exist_ok=True)
-
-        with open(os.path.join(submodule_path, function_file)) as f:
-            function_file_rst_content = f.readlines()
-            submodule_function_line = [
-                idx
-                for idx in range(len(function_file_rst_content))
-                if ".. autofunction::" in function_file_rst_content[idx]
-            ][0]
+        OUTPUT_TREE.makedirs(function_dir)
 
-        with open(
-            os.path.join(function_dir, file[0:-4] + "_{}.rst".format(function_type)),
-            "w",
-        ) as f:
-            for i in range(len(rst_content)):
-                rst_content[i] = rst_content[i].replace("/logos", "/../../logos")
-            rst_content[0] = "ivy.{}.{}\n".format(
-                function_type.capitalize(), raw_function_name
+        function_filepath = os.path.join(submodule_path, function_file)
+        if function_filepath not in functional_rsts:
+            functional_rsts[function_filepath] = OUTPUT_TREE.readlines(
+                function_filepath
             )
-            rst_content[1] = "=" * len(rst_content[0].strip("\n"))
-            f.writelines(rst_content)
+        function_file_rst_content = functional_rsts[function_filepath]
+        submodule_function_line = [
+            idx
+            for idx in range(len(function_file_rst_content))
+            if ".. autofunction::" in function_file_rst_content[idx]
+        ][0]
+
+        for i in range(len(rst_content)):
+            rst_content[i] = rst_content[i].replace("/logos", "/../../logos")
+        rst_content[0] = "ivy.{}.{}\n".format(
+            function_type.capitalize(), raw_function_name
+        )
+        rst_content[1] = "=" * len(rst_content[0].strip("\n"))
+        OUTPUT_TREE.write(
+            os.path.join(function_dir, file[0:-4] + "_{}.rst".format(function_type)),
+            "".join(rst_content),
+        )
 
-        if not os.path.exists(
+        if not OUTPUT_TREE.exists(
             os.path.join(function_dir, function_name + "_functional.rst")
         ):
-            with open(
-                os.path.join(function_dir, function_name + "_functional.rst"), "w"
-            ) as f:
-                temp_content = function_file_rst_content.copy()
-                for i in range(len(temp_content)):
-                    temp_content[i] = temp_content[i].replace("/logos", "/../logos")
-                temp_content[0] = "ivy.{}\n".format(function_name)
-                temp_content[1] = "=" * len(temp_content[0].strip("\n"))
-                f.writelines(temp_content)
-
-        final_content = (
+            temp_content = function_file_rst_content.copy()
+            for i in range(len(temp_content)):
+                temp_content[i] = temp_content[i].replace("/logos", "/../logos")
+            temp_content[0] = "ivy.{}\n".format(function_name)
+            temp_content[1] = "=" * len(temp_content[0].strip("\n"))
+            OUTPUT_TREE.write(
+                os.path.join(function_dir, function_name + "_functional.rst"),
+                "".join(temp_content),
+            )
+
+        # The functional rst is written once all instance methods are added
+        functional_rsts[function_filepath] = (
             function_file_rst_content[0 : submodule_function_line + 1]
             + ["\n" + function_line]
             + function_file_rst_content[submodule_function_line + 1 :]
         )
 
-        with open(os.path.join(submodule_path, function_file), "w") as f:
-            f.writelines(final_content)
-
-        functions.append(os.path.join(submodule_path, function_file))
+        functions.append(function_filepath)
 
     functions = list(set(functions))
     return functions
@@ -677,42 +921,48 @@ def add_instance_and_static_rsts():
     functional_path = os.path.join(
         THIS_DIR, "autogenerated_source", "functional", "ivy"
     )
-    array_path = os.path.join(
-        THIS_DIR, "autogenerated_source", "array", "array_methods"
-    )
+    array_path = os.path.join(THIS_DIR, get_doc_path("array/array_methods"))
     array_code_path = os.path.join(ROOT_DIR, "array", "array_methods.py")
     container_path = os.path.join(
-        THIS_DIR, "autogenerated_source", "container", "container_methods"
+        THIS_DIR, get_doc_path("container/container_methods")
     )
     container_code_path = os.path.join(ROOT_DIR, "container", "container_methods.py")
 
-    # Read array code
-    with open(array_code_path, "r") as f:
-        array_str = f.read()
+    # Array code
+    array_str = get_generated_code(array_code_path)
 
-    # Read container code
-    with open(container_code_path, "r") as f:
-        container_str = f.read()
+    # Container code
+    container_str = get_generated_code(container_code_path)
 
     # List all rst files inside array_methods
-    array_files = os.listdir(array_path)
+    array_files = OUTPUT_TREE.listdir(array_path)
 
     # List all rst files inside container_methods
-    container_files = os.listdir(container_path)
+    container_files = OUTPUT_TREE.listdir(container_path)
+
+    functional_rsts = dict()
 
     functions1 = append_instance_content_to_rst(
-        "container", container_path, container_files, container_str, functional_path
+        "container",
+        container_path,
+        container_files,
+        container_str,
+        functional_path,
+        functional_rsts,
     )
 
     functions2 = append_instance_content_to_rst(
-        "array", array_path, array_files, array_str, functional_path
+        "array", array_path, array_files, array_str, functional_path, functional_rsts
     )
 
+    for function_filepath, function_file_rst_content in functional_rsts.items():
+        OUTPUT_TREE.write(function_filepath, "".join(function_file_rst_content))
+
     functions = functions1 + functions2
     functions = list(set(functions))
     for function in functions:
         function_dir = function[0:-4]
-        files = os.listdir(function_dir)
+        files = OUTPUT_TREE.listdir(function_dir)
         index = [index for index in range(len(files)) if "functional" in files[index]][
             0
         ]
@@ -726,23 +976,21 @@ def add_instance_and_static_rsts():
 
 
 def write_header_to_rst(file_path, title, module_name):
-    with open(file_path, "w") as f:
-        f.write(
-            title.capitalize() + "\n" + "=" * len(title) + "\n\n"
-            ".. automodule:: "
-            + module_name
-            + "\n"
-            + "    :members:\n"
-            + "    :special-members: __init__\n"
-            + "    :undoc-members:\n"
-            + "    :show-inheritance:\n"
-        )
+    OUTPUT_TREE.write(
+        file_path,
+        title.capitalize() + "\n" + "=" * len(title) + "\n\n"
+        ".. automodule:: "
+        + module_name
+        + "\n"
+        + "    :members:\n"
+        + "    :special-members: __init__\n"
+        + "    :undoc-members:\n"
+        + "    :show-inheritance:\n",
+    )
 
 
 def copy_contents_and_update_path(file_path, copy_from_file, submodule):
-    content = []
-    with open(copy_from_file) as f:
-        content = f.readlines()
+    content = OUTPUT_TREE.readlines(copy_from_file)
     i, n = 0, len(content)
     while i < n:
         if ':hidden:' in content[i]:
@@ -751,14 +999,11 @@ def copy_contents_and_update_path(file_path, copy_from_file, submodule):
             n += 1
         if '/' in content[i]:
             function_file = '/'.join(copy_from_file.split('/')[0:-1]) + '/' + content[i].strip(' ').strip('\n')
-            with open(function_file) as f:
-                function_content = f.readlines()
-            with open(function_file, 'w+') as f:
-                f.writelines(function_content[3:])
+            function_content = OUTPUT_TREE.readlines(function_file)
+            OUTPUT_TREE.write(function_file, ''.join(function_content[3:]))
             content[i] = content[i].replace(submodule, '{}/{}'.format(submodule, submodule))
         i += 1
-    with open(file_path, 'w') as f:
-        f.writelines(content)
+    OUTPUT_TREE.write(file_path, ''.join(content))
 
 
 def write_header_and_toctree_to_rst(
@@ -773,125 +1018,337 @@ def write_header_and_toctree_to_rst(
     else:
         write_header_to_rst(file_path, title, module_name)
     toctree_dict = {}
-    files = [file for file in os.listdir(folder_path) if ".rst" in file and file.split('/')[-1] not in ["array.rst", "container.rst"]]
+    # The rst files of the generated modules are removed once the instance methods are added to the functions
+    files = [
+        file
+        for file in OUTPUT_TREE.listdir(folder_path)
+        if ".rst" in file
+        and file not in ["array.rst", "container.rst"]
+        and file[:-4] + ".py" not in GENERATED_MODULES
+    ]
     files.sort()
     toctree_dict[submodule] = files
     append_toctree_to_rst(toctree_dict, file_path, title)
 
 
 def update_image_paths(folder_path, old_path, new_path):
-    folders = [folder for folder in os.listdir(folder_path) if ".rst" not in folder]
+    folders = [
+        folder for folder in OUTPUT_TREE.listdir(folder_path) if ".rst" not in folder
+    ]
     if len(folders) == 0:
-        files = [file for file in os.listdir(folder_path) if ".rst" in file]
+        files = [file for file in OUTPUT_TREE.listdir(folder_path) if ".rst" in file]
         for file in files:
-            content = ""
-            with open(os.path.join(folder_path, file)) as f:
-                content = f.read()
+            content = OUTPUT_TREE.read(os.path.join(folder_path, file))
             content = content.replace(old_path, new_path)
-            with open(os.path.join(folder_path, file), "w") as f:
-                f.write(content)
+            OUTPUT_TREE.write(os.path.join(folder_path, file), content)
     for folder in folders:
         update_image_paths(os.path.join(folder_path, folder), old_path, new_path)
 
 
-def move_folders_to_classes():
-    doc_path = os.path.join(THIS_DIR, "autogenerated_source")
-    data_classes_path = os.path.join(doc_path, "data_classes")
-    os.makedirs(data_classes_path, exist_ok=True)
-    shutil.move(os.path.join(doc_path, "array"), data_classes_path)
-    shutil.move(os.path.join(doc_path, "container"), data_classes_path)
-
-    write_header_and_toctree_to_rst(
-        os.path.join(doc_path, "stateful"),
-        os.path.join(doc_path, "stateful.rst"),
-        "Framework Classes",
-        "ivy.stateful",
-        "stateful",
+def set_scope(root_dir, only):
+    # Items of --only which are folders or modules of the root directory select their pages,
+    # all others are glob patterns of names
+    global ONLY_DOC_PATHS, ONLY_NAME_PATTERNS
+    ONLY_DOC_PATHS, ONLY_NAME_PATTERNS = [], []
+    for item in only:
+        rel_path = item.strip("/")
+        if rel_path[-3:] == ".py":
+            rel_path = rel_path[:-3]
+        if os.path.isdir(os.path.join(root_dir, rel_path)) or os.path.isfile(
+            os.path.join(root_dir, rel_path + ".py")
+        ):
+            ONLY_DOC_PATHS.append(os.path.normpath(get_doc_path(rel_path)))
+        else:
+            ONLY_NAME_PATTERNS.append(item)
+
+
+def in_scope(doc_path, dotted_name=None):
+    # Whether the page at doc_path, given without .rst, is selected for the build. A page is selected with the pages
+    # below it, names match the page, the folders above it and the dotted name of the object it documents.
+    if ONLY_DOC_PATHS is None:
+        return True
+    doc_path = os.path.normpath(doc_path)
+    for only_path in ONLY_DOC_PATHS:
+        if doc_path == only_path or doc_path.startswith(only_path + os.sep):
+            return True
+    names = doc_path.split(os.sep)[1:]
+    if dotted_name is not None:
+        names.append(dotted_name)
+    return any(
+        fnmatch.fnmatchcase(name, pattern)
+        for name in names
+        for pattern in ONLY_NAME_PATTERNS
     )
 
-    write_header_and_toctree_to_rst(
-        os.path.join(doc_path, "data_classes", "array"),
-        os.path.join(doc_path, "data_classes", "array.rst"),
-        "Array",
-        "ivy.Array",
-        "array",
-    )
 
-    write_header_and_toctree_to_rst(
-        os.path.join(doc_path, "data_classes", "container"),
-        os.path.join(doc_path, "data_classes", "container.rst"),
-        "Container",
-        "ivy.Container",
-        "container",
+def get_function_names_in_scope(source_dir):
+    # The names of the functions documented by the selected pages, as looked up in the device support flags
+    repo_name = ROOT_DIR.split("/")[-1]
+    fn_names = set()
+    for module in source_dir.modules:
+        rel_path = os.path.relpath(module, ROOT_DIR)[:-3]
+        dotted_namespace = ".".join([repo_name] + rel_path.split(os.sep))
+        for symbol in scan_module(module).functions:
+            if symbol.name[0] != "_" and in_scope(
+                os.path.join(get_doc_path(rel_path), symbol.name),
+                dotted_namespace + "." + symbol.name,
+            ):
+                fn_names.add(supported_devices.get_function_name(symbol.name))
+    for child in source_dir.children.values():
+        fn_names.update(get_function_names_in_scope(child))
+    return fn_names
+
+
+def filter_toctrees(page, kept_pages):
+    # Removes the toctree entries of the page which refer to pages that are not kept,
+    # and the toctrees left without entries, which sphinx would still show with their caption
+    content = []
+    toctree = []
+    toctree_indent = None
+    toctree_kept = False
+    for line in OUTPUT_TREE.readlines(page):
+        stripped = line.strip()
+        indent = len(line) - len(line.lstrip())
+        if toctree_indent is not None and stripped and indent <= toctree_indent:
+            if toctree_kept:
+                content += toctree
+            toctree_indent = None
+        if stripped.startswith(".. toctree::"):
+            toctree, toctree_indent, toctree_kept = [line], indent, False
+            continue
+        if toctree_indent is None:
+            content.append(line)
+            continue
+        if stripped and stripped[0] != ":":
+            entry = stripped
+            if entry[-1] == ">" and "<" in entry:
+                entry = entry[entry.rindex("<") + 1 : -1]
+            if entry[0] == "/":
+                target = os.path.join(OUTPUT_TREE.root, entry[1:])
+            else:
+                target = os.path.join(os.path.dirname(page), entry)
+            target = os.path.normpath(target)
+            if target[-4:] != ".rst":
+                target += ".rst"
+            external = entry == "self" or "://" in entry or "*" in entry
+            if not external and target not in kept_pages:
+                continue
+            toctree_kept = True
+        toctree.append(line)
+    if toctree_indent is not None and toctree_kept:
+        content += toctree
+    return "".join(content)
+
+
+def prune_to_scope():
+    """Remove the pages which are not selected by --only from the output tree.
+
+    The pages above the selected ones and the index are kept, with toctrees listing the kept pages only.
+    Returns the number of kept and of all pages.
+    """
+    source_root = os.path.dirname(OUTPUT_TREE.root)
+    pages = sorted(key for key in OUTPUT_TREE.files if key[-4:] == ".rst")
+    kept_pages = {os.path.join(OUTPUT_TREE.root, "index.rst")}
+    for page in pages:
+        dotted_name = None
+        if ONLY_NAME_PATTERNS:
+            match = re.search(
+                r"^\.\. auto(?:function|class):: (\S+)", OUTPUT_TREE.read(page), re.M
+            )
+            if match is not None:
+                dotted_name = match.group(1)
+        if not in_scope(os.path.relpath(page[:-4], source_root), dotted_name):
+            continue
+        kept_pages.add(page)
+        directory = os.path.dirname(page)
+        while directory != OUTPUT_TREE.root:
+            if directory + ".rst" in OUTPUT_TREE.files:
+                kept_pages.add(directory + ".rst")
+            directory = os.path.dirname(directory)
+    for page in pages:
+        if page in kept_pages:
+            OUTPUT_TREE.write(page, filter_toctrees(page, kept_pages))
+        else:
+            OUTPUT_TREE.remove(page)
+    return len(kept_pages.intersection(pages)), len(pages)
+
+
+def read_requirement_import_names(requirements_path):
+    # The names the packages of a requirements file are imported with, e.g. jax for jax[cpu]==0.3.14
+    import_names = set()
+    if not os.path.isfile(requirements_path):
+        return import_names
+    with open(requirements_path, "r") as f:
+        for line in f:
+            line = line.split("#")[0].strip()
+            if not line or line[0] == "-":
+                continue
+            package = re.split(r"[\s\[<>=!~;@]", line, 1)[0].lower()
+            import_names.add(IMPORT_NAMES.get(package, package.replace("-", "_")))
+    return import_names
+
+
+def get_imported_packages(source_dir):
+    # The packages imported when the modules of the directory and of the ones below it are imported, including the
+    # __init__ modules which are not documented but imported along with every other module of their package
+    packages = set()
+    for name in source_dir.names:
+        if name[-3:] == ".py":
+            packages.update(scan_imports(os.path.join(source_dir.path, name)))
+    for child in source_dir.children.values():
+        packages.update(get_imported_packages(child))
+    return packages
+
+
+def get_mock_imports(source_dir, extra_mock_imports=()):
+    mockable = set(MOCKED_FRAMEWORKS) | read_requirement_import_names(
+        OPTIONAL_REQUIREMENTS_PATH
     )
-
-    write_header_and_toctree_to_rst(
-        os.path.join(doc_path, "data_classes"),
-        os.path.join(doc_path, "data_classes.rst"),
-        "Data Classes",
-        "ivy.data_classes",
-        "data_classes",
+    project_package = os.path.basename(os.path.normpath(ROOT_DIR))
+    mock_imports = set(
+        package
+        for package in get_imported_packages(source_dir)
+        if package in mockable and package != project_package
+    )
+    return sorted(mock_imports.union(extra_mock_imports))
+
+
+def get_signatures(source_dir, signatures=None):
+    # The signatures of the functions and classes of the documented modules by their fully qualified name,
+    # classes with the parameters of their __init__ method
+    if signatures is None:
+        signatures = dict()
+    for module in source_dir.modules:
+        dotted_module = os.path.relpath(module[:-3], os.path.dirname(ROOT_DIR))
+        dotted_module = dotted_module.replace(os.sep, ".")
+        module_symbols = scan_module(module)
+        for symbol in module_symbols.functions:
+            signature = get_signature(module_symbols, symbol)
+            if signature is not None:
+                signatures[dotted_module + "." + symbol.name] = signature
+        for symbol in module_symbols.classes:
+            for method in symbol.methods:
+                signature = get_signature(module_symbols, method)
+                if method.name == "__init__" and signature is not None:
+                    signatures[dotted_module + "." + symbol.name] = (
+                        drop_first_parameter(signature[0]),
+                        None,
+                    )
+    for child in source_dir.children.values():
+        get_signatures(child, signatures)
+    return signatures
+
+
+def write_mock_imports(source_dir, extra_mock_imports=()):
+    """Configure autodoc to mock the frameworks imported by the documented modules, and write the signature cache.
+
+    Returns the mocked packages.
+    """
+    mock_imports = get_mock_imports(source_dir, extra_mock_imports)
+    conf_path = os.path.join(OUTPUT_TREE.root, "conf.py")
+    OUTPUT_TREE.write(
+        conf_path,
+        OUTPUT_TREE.read(conf_path).replace(
+            "autodoc_mock_imports = []",
+            "autodoc_mock_imports = {}".format(mock_imports),
+        ),
     )
+    OUTPUT_TREE.write(
+        SIGNATURES_PATH,
+        json.dumps(get_signatures(source_dir), indent=1, sort_keys=True),
+    )
+    return mock_imports
 
-    with open(os.path.join(doc_path, "index.rst")) as f:
-        index_page_content = f.readlines()
-
-    result_content = []
-    toctree_content = []
-    inside_toctree = False
-    for i in range(len(index_page_content)):
-        line = index_page_content[i]
-        if ".. toctree::" in line:
-            toctree_content.append("")
-            inside_toctree = True
-        if not inside_toctree:
-            result_content.append(line)
-        else:
-            toctree_content[-1] += line
-    toctree_content = [
-        content
-        for content in toctree_content
-        if ":caption: Array" not in content
-        and ":caption: Container" not in content
-        and ":caption: Stateful" not in content
-    ]
-    index = [
-        index
-        for index in range(len(toctree_content))
-        if ":caption: Functions" in toctree_content[index]
-    ][0]
 
-    with open(os.path.join(doc_path, "index.rst"), "w") as f:
-        f.writelines(result_content)
-        f.writelines(toctree_content[0 : index + 1])
+def hash_file(file_path):
+    with open(file_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
 
-    toctree_dict = {}
-    files = [
-        file
-        for file in os.listdir(os.path.join(doc_path, "data_classes"))
-        if ".rst" in file
-    ]
-    toctree_dict["data_classes"] = files
-    append_toctree_to_rst(
-        toctree_dict, os.path.join(doc_path, "index.rst"), "Data Classes", False
-    )
 
-    toctree_dict = {}
-    files = [
-        file
-        for file in os.listdir(os.path.join(doc_path, "stateful"))
-        if ".rst" in file
+def hash_input_files(
+    root_dir, submodules_title, mock_imports=None, support_matrix_path=None
+):
+    # Hash every file the generated content depends on: the scanned modules and READMEs,
+    # the partial source, the configuration files and the generator itself,
+    # and in ivy the device support flags with the versions of ivy and the frameworks they were found with
+    input_paths = []
+    module_paths = []
+    skipped_dirs = [os.path.join(root_dir, sts) for sts in SUBMODS_TO_SKIP]
+    for directory, sub_dirs, files in os.walk(root_dir):
+        sub_dirs[:] = sorted(
+            item
+            for item in sub_dirs
+            if item not in EXCLUDED_DIRS
+            and os.path.join(directory, item) not in skipped_dirs
+        )
+        input_paths += [
+            os.path.join(directory, item)
+            for item in sorted(files)
+            if item == "README.rst"
+        ]
+        module_paths += [
+            os.path.join(directory, item)
+            for item in sorted(files)
+            if item[-3:] == ".py" and item not in GENERATED_MODULES
+        ]
+    for directory, sub_dirs, files in os.walk("partial_source"):
+        sub_dirs.sort()
+        input_paths += [os.path.join(directory, item) for item in sorted(files)]
+    input_paths.append("../README.rst")
+    input_paths.append(OPTIONAL_REQUIREMENTS_PATH)
+    input_paths += [
+        os.path.join(THIS_DIR, item)
+        for item in [
+            "generate_src_rst_files.py",
+            "module_scanner.py",
+            "output_tree.py",
+            "supported_devices.py",
+            "ivy_modules.txt",
+            "submods_to_skip.txt",
+            "submods_to_step.txt",
+            "submod_orders.txt",
+        ]
     ]
-    toctree_dict["stateful"] = files
-    append_toctree_to_rst(
-        toctree_dict, os.path.join(doc_path, "index.rst"), "Framework Classes", False
-    )
+    hashes = {path: hash_file(path) for path in input_paths if os.path.isfile(path)}
+    # the modules are read once, for their hash and for the scan generating the content
+    for path in module_paths:
+        hashes[path] = hashlib.sha256(read_module(path)).hexdigest()
+    hashes["arguments"] = json.dumps([root_dir, submodules_title, mock_imports])
+    if IVY_ONLY and supported_devices is not None:
+        hashes["support_matrix_key"] = json.dumps(
+            supported_devices.get_support_matrix_key(root_dir), sort_keys=True
+        )
+        hashes["support_matrix"] = hash_support_matrix(support_matrix_path)
+    return hashes
+
+
+def hash_support_matrix(support_matrix_path):
+    if support_matrix_path is None or not os.path.isfile(support_matrix_path):
+        return None
+    return hash_file(support_matrix_path)
+
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return dict()
+    with open(MANIFEST_PATH, "r") as f:
+        return json.load(f)
+
 
-    with open(os.path.join(doc_path, "index.rst"), "a") as f:
-        f.writelines(toctree_content[index + 1 :])
+def save_manifest(input_hashes):
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump({"inputs": input_hashes}, f, indent=1, sort_keys=True)
 
 
-def main(root_dir, submodules_title):
+def main(
+    root_dir,
+    submodules_title,
+    incremental=False,
+    support_matrix_path=".support_matrix.json",
+    jobs=1,
+    only=None,
+    mock_imports=None,
+):
     # This directory contains all files in the repository along with the permitted_namespaces.json, submods_to_skip.txt and submods_to_step.txt files
     global THIS_DIR
     THIS_DIR = os.path.dirname(os.path.realpath(__file__))
@@ -948,36 +1405,130 @@ def main(root_dir, submodules_title):
     with open("partial_source/conf.py", "w") as conf_file:
         conf_file.write(conf_contents)
 
-    # just to remove previously generated rst files
-    if os.path.exists("autogenerated_source"):
-        shutil.rmtree("autogenerated_source")
+    # Partial builds only keep the selected pages
+    if only is not None:
+        set_scope(root_dir, only)
+
+    # All images will be used in the documentation so they are copied to the build folder,
+    # which is deleted before builds reusing the cached content as well
+    build_dir = "build" if only is None else ONLY_BUILD_DIR
+    shutil.copytree(
+        "partial_source/images",
+        os.path.join(build_dir, "_images"),
+        copy_function=copy_image,
+        dirs_exist_ok=True,
+    )
+
+    # In incremental builds nothing is generated when none of the inputs changed since the last build
+    if incremental and only is None:
+        input_hashes = hash_input_files(
+            root_dir, submodules_title, mock_imports, support_matrix_path
+        )
+        if (
+            os.path.exists("autogenerated_source")
+            and load_manifest().get("inputs") == input_hashes
+        ):
+            print("RST files are up to date")
+            return
+
+    # The content is generated in memory, starting with a copy of the partial source
+    global OUTPUT_TREE
+    OUTPUT_TREE = OutputTree("autogenerated_source")
+    with build_stats.measure("copy_partial_source"):
+        OUTPUT_TREE.copy_from_disk("partial_source", "autogenerated_source")
+
+    # Device support flags stored by a previous build are reused unless ivy or the frameworks changed
+    if IVY_ONLY and supported_devices is not None:
+        with build_stats.measure("load_support_matrix"):
+            supported_devices.load_support_matrix(support_matrix_path, root_dir)
+
+    # The project is listed once, both the instance methods and the rst files are found from this model
+    excluded_modules = EXCLUDED_MODULES
+    if IVY_ONLY:
+        excluded_modules = excluded_modules + [
+            module[:-3] for module in GENERATED_MODULES
+        ]
+    with build_stats.measure("scan_directory"):
+        source_dir = scan_directory(
+            root_dir,
+            EXCLUDED_DIRS,
+            excluded_modules,
+            [os.path.join(root_dir, sts) for sts in SUBMODS_TO_SKIP],
+        )
+
+    # Builds which mock the frameworks do not import them to find missing flags either
+    if mock_imports is not None and supported_devices is not None:
+        supported_devices.PROBE_ON_MISS = False
+
+    # The missing flags of the documented functions, only the selected ones in partial builds, are found at once
+    # before the generation, which may run in worker processes, and functions still missing then have no flags
+    if IVY_ONLY and supported_devices is not None and supported_devices.PROBE_ON_MISS:
+        with build_stats.measure("build_support_matrix"):
+            supported_devices.build_support_matrix(
+                sorted(get_function_names_in_scope(source_dir))
+            )
+        supported_devices.PROBE_ON_MISS = False
 
-    # All images will be used in the documentation so they are copied to the build folder.
-    shutil.copytree("partial_source/images", "build/_images")
-    shutil.copytree("partial_source", "autogenerated_source")
+    # The sub directories of the root are generated in parallel, the rest of the content below
+    if jobs > 1:
+        with build_stats.measure("generate_subtrees_in_parallel"):
+            generate_subtrees_in_parallel(source_dir, jobs)
 
     if IVY_ONLY:
-        # To add all instance methods into another file.
-        add_instance_and_static_methods(root_dir)
+        # To add all instance methods into another module.
+        with build_stats.measure("add_instance_and_static_methods"):
+            add_instance_and_static_methods(source_dir)
+            scan_generated_modules()
+            write_generated_modules()
 
     # To create all rst files which contain the markup used by sphinx for generating the documentation.
-    create_rst_files(root_dir)
+    with build_stats.measure("create_rst_files"):
+        create_rst_files(source_dir)
+
+    if IVY_ONLY and supported_devices is not None:
+        with build_stats.measure("save_support_matrix"):
+            supported_devices.save_support_matrix(support_matrix_path)
 
     if IVY_ONLY:
         # Modify rst file paths to display functional, array and container methods in the same section
-        add_instance_and_static_rsts()
+        with build_stats.measure("add_instance_and_static_rsts"):
+            add_instance_and_static_rsts()
 
         # Remove files and folders created for instance methods
-        shutil.rmtree("autogenerated_source/container/container_methods")
-        os.remove("autogenerated_source/container/container_methods.rst")
-        shutil.rmtree("autogenerated_source/array/array_methods")
-        os.remove("autogenerated_source/array/array_methods.rst")
-
-        # Move the stateful, array and container folders inside the classes folder
-        move_folders_to_classes()
+        OUTPUT_TREE.rmtree(get_doc_path("container/container_methods"))
+        OUTPUT_TREE.remove(get_doc_path("container/container_methods.rst"))
+        OUTPUT_TREE.rmtree(get_doc_path("array/array_methods"))
+        OUTPUT_TREE.remove(get_doc_path("array/array_methods.rst"))
 
         write_discussion_links()
 
+    if mock_imports is not None:
+        with build_stats.measure("write_mock_imports"):
+            mocked = write_mock_imports(source_dir, mock_imports)
+        print("Mocking {}".format(", ".join(mocked) or "no imports"))
+
+    if only is not None:
+        with build_stats.measure("prune_to_scope"):
+            num_kept, num_pages = prune_to_scope()
+        print("{} of {} rst files selected by --only".format(num_kept, num_pages))
+
+    # Files with the same content as in the previous build are not written again and keep their modification time,
+    # so the sphinx environment considers them unchanged and does not read them again
+    output_dir = "autogenerated_source" if only is None else ONLY_SOURCE_DIR
+    with build_stats.measure("flush"):
+        num_written, num_unchanged, num_removed = OUTPUT_TREE.flush(output_dir)
+    print(
+        "{} files written, {} unchanged and {} removed in {}".format(
+            num_written, num_unchanged, num_removed, output_dir
+        )
+    )
+
+    if incremental and only is None:
+        if "support_matrix" in input_hashes:
+            # the flags found by this build are stored with the content generated from them
+            input_hashes["support_matrix"] = hash_support_matrix(support_matrix_path)
+        save_manifest(input_hashes)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -992,6 +1543,55 @@ if __name__ == "__main__":
         help="The title for the combination of submodules."
         "Only valid when there are no submodule directories.",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip generation when no input changed since the last build, "
+        "and keep the modification times of unchanged rst files.",
+    )
+    parser.add_argument(
+        "--support_matrix",
+        type=str,
+        default=".support_matrix.json",
+        help="File the device support flags of ivy's functions are stored in between builds.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes generating the sub directories of the root, 0 uses all cores.",
+    )
+    parser.add_argument(
+        "--only",
+        type=str,
+        nargs="+",
+        help="Only generate the pages of these folders or modules of the root directory, "
+        "e.g. functional/ivy/linear_algebra.py, or of the functions and classes matching these glob patterns, "
+        "together with the pages above them, into the autogenerated_source_only folder.",
+    )
+    parser.add_argument(
+        "--mock_imports",
+        type=str,
+        nargs="*",
+        help="Let autodoc mock the ML frameworks and optional requirements imported by the documented modules, "
+        "and these packages as well, so that no framework is imported to build the documentation. "
+        "Device support flags are only read from the support matrix.",
+    )
+    parser.add_argument(
+        "--stats",
+        type=str,
+        help="JSON report the time and resources of the generation are added to.",
+    )
     parsed_args = parser.parse_args()
-    main(parsed_args.root_dir, parsed_args.submodules_title)
+    if parsed_args.stats:
+        build_stats.start(parsed_args.stats, "generate_src_rst_files")
+    main(
+        parsed_args.root_dir,
+        parsed_args.submodules_title,
+        parsed_args.incremental,
+        parsed_args.support_matrix,
+        parsed_args.jobs or os.cpu_count(),
+        parsed_args.only,
+        parsed_args.mock_imports,
+    )
     print("RST files created")
\ No newline at end of file
@@ -0,0 +1,98 @@
+#!/bin/bash
+# installs the requirements of the projects in the given folders, skipped when requirements with the same hash are installed
+# usage: install_requirements.sh <project folder>... [--download]
+# the requirements of several projects are installed together, so that they are resolved into one environment
+# with --download the wheels of the requirements are only stored in the wheelhouse, for later installs without network
+
+projects=()
+download=false
+for arg in "$@"
+do
+    if [[ "$arg" == "--download" ]]
+    then
+        download=true
+    else
+        projects+=("$arg")
+    fi
+done
+
+# folder of wheels installed when the package index cannot be reached
+wheelhouse="$WHEELHOUSE"
+
+# hash of the installed requirements, written once they are all installed
+stamp="$HOME/.requirements_hash"
+
+# packages installed before the optional requirements, which need them to be built
+optional_prerequisites=("torch==1.11.0" "torch-scatter==2.0.9")
+
+requirements_args=()
+optional_args=()
+requirements_hash=$(
+    for project in "${projects[@]}"
+    do
+        for file in "$project/requirements/requirements.txt" "$project/requirements/optional.txt"
+        do
+            if [[ -f "$file" ]]
+            then
+                echo "${file#"$project"/}"
+                cat "$file"
+            fi
+        done
+    done
+    printf '%s\n' "${optional_prerequisites[@]}"
+)
+requirements_hash=$(echo "$requirements_hash" | sha256sum | cut -c1-16)
+for project in "${projects[@]}"
+do
+    requirements_args+=("-r" "$project/requirements/requirements.txt")
+    if [[ -f "$project/requirements/optional.txt" ]]
+    then
+        optional_args+=("-r" "$project/requirements/optional.txt")
+    fi
+done
+
+if [ "$download" = true ]
+then
+    if [[ -z "$wheelhouse" ]]
+    then
+        echo "WHEELHOUSE is not set"
+        exit 1
+    fi
+    mkdir -p "$wheelhouse" || exit 1
+    pip3 download -d "$wheelhouse" "${requirements_args[@]}" || exit 1
+    if [ ${#optional_args[@]} -gt 0 ]
+    then
+        pip3 download -d "$wheelhouse" "${optional_prerequisites[@]}" || exit 1
+        pip3 download -d "$wheelhouse" "${optional_args[@]}" || exit 1
+    fi
+    exit
+fi
+
+if [[ -f "$stamp" && "$(cat "$stamp")" == "$requirements_hash" ]]
+then
+    echo "requirements $requirements_hash already installed"
+    exit
+fi
+
+pip_install() {
+    # the wheelhouse is searched along with the package index, and used alone when the index cannot be reached
+    if [[ -n "$wheelhouse" && -d "$wheelhouse" ]]
+    then
+        pip3 install --find-links "$wheelhouse" "$@" || pip3 install --no-index --find-links "$wheelhouse" "$@"
+    else
+        pip3 install "$@"
+    fi
+}
+
+pip_install "${requirements_args[@]}" || exit 1
+if [ ${#optional_args[@]} -gt 0 ]
+then
+    for requirement in "${optional_prerequisites[@]}"
+    do
+        pip_install "$requirement"
+    done
+    pip_install "${optional_args[@]}" || exit 1
+fi
+
+echo "$requirements_hash" > "$stamp"
+echo "requirements $requirements_hash installed"
@@ -0,0 +1,269 @@
+# This file is used by generate_src_rst_files.py to find the modules of the documented project and their functions and classes
+# The project is listed once and every module is read and parsed once per build, the resulting symbol table is cached
+# for all later lookups
+
+import os
+import ast
+import bisect
+import logging
+import build_stats
+from collections import namedtuple
+
+# A function, class or method of a module, line numbers start at 1.
+# body_lineno is the first line of the body, docstring_lines the (first, last) lines of the docstring if there is one
+# and methods the methods of a class.
+Symbol = namedtuple(
+    "Symbol",
+    [
+        "name",
+        "lineno",
+        "end_lineno",
+        "body_lineno",
+        "docstring",
+        "docstring_lines",
+        "methods",
+    ],
+)
+
+# The symbol table of a module
+ModuleSymbols = namedtuple("ModuleSymbols", ["path", "lines", "functions", "classes"])
+
+_SYMBOL_TABLES = dict()
+
+# The contents of the modules, which incremental builds also hash before scanning them
+_MODULE_CONTENTS = dict()
+
+
+def _make_symbol(node, methods=()):
+    docstring = ast.get_docstring(node, clean=False)
+    docstring_lines = None
+    if docstring is not None:
+        docstring_lines = (node.body[0].lineno, node.body[0].end_lineno)
+    return Symbol(
+        node.name,
+        node.lineno,
+        node.end_lineno,
+        node.body[0].lineno,
+        docstring,
+        docstring_lines,
+        tuple(methods),
+    )
+
+
+def _module_level_nodes(body):
+    # Definitions at module level, including the ones inside if, try and with blocks
+    for node in body:
+        if isinstance(node, (ast.If, ast.Try, ast.With)):
+            yield from _module_level_nodes(node.body)
+            yield from _module_level_nodes(getattr(node, "orelse", []))
+            for handler in getattr(node, "handlers", []):
+                yield from _module_level_nodes(handler.body)
+            yield from _module_level_nodes(getattr(node, "finalbody", []))
+        else:
+            yield node
+
+
+def _scan_source(source):
+    tree = ast.parse(source)
+    functions, classes, names = [], [], set()
+    for node in _module_level_nodes(tree.body):
+        if getattr(node, "name", None) in names:
+            # Conditionally defined symbols are documented once
+            continue
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions.append(_make_symbol(node))
+        elif isinstance(node, ast.ClassDef):
+            methods = [
+                _make_symbol(item)
+                for item in node.body
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+            classes.append(_make_symbol(node, methods))
+        else:
+            continue
+        names.add(node.name)
+    return functions, classes
+
+
+def _scan_source_by_keywords(source):
+    # Fallback for modules which cannot be parsed, only names are known
+    def symbols(keyword):
+        return [
+            Symbol(item.split("(")[0], None, None, None, None, None, ())
+            for item in source.split(keyword)[1:]
+        ]
+
+    return symbols("\ndef "), symbols("\nclass ")
+
+
+def read_module(module_path):
+    """Return the bytes of the module, reading it on first use."""
+    if module_path not in _MODULE_CONTENTS:
+        with open(module_path, "rb") as file:
+            _MODULE_CONTENTS[module_path] = file.read()
+        build_stats.record_read(len(_MODULE_CONTENTS[module_path]))
+    return _MODULE_CONTENTS[module_path]
+
+
+def _read_source(module_path):
+    # decoded as a file opened in text mode, with universal newlines
+    source = read_module(module_path).decode("utf-8", errors="replace")
+    return source.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def scan_module(module_path, source=None):
+    """Return the symbol table of the module, reading and parsing it on first use.
+
+    Modules generated in memory are given with their source, which replaces any previous symbol table of the path.
+    """
+    if source is not None:
+        _SYMBOL_TABLES.pop(module_path, None)
+    if module_path not in _SYMBOL_TABLES:
+        if source is None:
+            source = _read_source(module_path)
+        try:
+            functions, classes = _scan_source(source)
+        except SyntaxError as e:
+            logging.warning("Could not parse {}, {}".format(module_path, e))
+            functions, classes = _scan_source_by_keywords(source)
+        _SYMBOL_TABLES[module_path] = ModuleSymbols(
+            module_path, source.split("\n"), functions, classes
+        )
+    return _SYMBOL_TABLES[module_path]
+
+
+def _skip_string(text, index):
+    # The index after the string literal starting at index
+    quote = text[index]
+    if text.startswith(quote * 3, index):
+        end = text.find(quote * 3, index + 3)
+        return len(text) if end == -1 else end + 3
+    index += 1
+    while index < len(text) and text[index] != quote:
+        if text[index] == "\\":
+            index += 1
+        index += 1
+    return index + 1
+
+
+def _read_until(text, index, stop_chars):
+    # The text from index up to the first of the stop characters outside of brackets, strings and comments,
+    # without the comments, and the index of that character
+    pieces, depth, start = [], 0, index
+    while index < len(text):
+        char = text[index]
+        if char in "'\"":
+            index = _skip_string(text, index)
+            continue
+        if char == "#":
+            pieces.append(text[start:index])
+            index = text.find("\n", index)
+            if index == -1:
+                index = len(text)
+            start = index
+            continue
+        if depth == 0 and char in stop_chars:
+            break
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        index += 1
+    pieces.append(text[start:index])
+    return "".join(pieces), index
+
+
+def get_signature(module_symbols, symbol):
+    """Return the parameters and the return annotation of a function as written in its module.
+
+    For example ("(x, /, *, out=None)", "ivy.Array"), the return annotation is None when the function has none
+    and the signature is None for modules which could not be parsed.
+    """
+    if symbol.lineno is None:
+        return None
+    header = "\n".join(module_symbols.lines[symbol.lineno - 1 : symbol.body_lineno])
+    index = header.find("(", header.find("def " + symbol.name))
+    parameters, index = _read_until(header, index + 1, ")")
+    parameters = " ".join(parameters.split()).rstrip(", ")
+    return_annotation = None
+    rest = header[index + 1 :].lstrip()
+    if rest.startswith("->"):
+        return_annotation, _ = _read_until(rest, 2, ":")
+        return_annotation = " ".join(return_annotation.split())
+    return "(" + parameters + ")", return_annotation
+
+
+def drop_first_parameter(parameters):
+    # The parameters of a method without self or cls, e.g. "(a, b=1)" for "(self, a, b=1)"
+    _, index = _read_until(parameters, 1, ",)")
+    if parameters[index] == ")":
+        return "()"
+    return "(" + parameters[index + 1 :].lstrip()
+
+
+_IMPORTS = dict()
+
+
+def scan_imports(module_path):
+    """Return the top level packages imported when the module is imported, e.g. torch for import torch.nn.
+
+    Relative imports and the imports inside functions and classes are not included.
+    """
+    if module_path not in _IMPORTS:
+        if module_path in _SYMBOL_TABLES:
+            source = "\n".join(_SYMBOL_TABLES[module_path].lines)
+        else:
+            source = _read_source(module_path)
+        packages = set()
+        try:
+            tree = ast.parse(source)
+        except SyntaxError as e:
+            logging.warning("Could not parse {}, {}".format(module_path, e))
+            tree = ast.Module(body=[], type_ignores=[])
+        for node in _module_level_nodes(tree.body):
+            if isinstance(node, ast.Import):
+                packages.update(alias.name.split(".")[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0:
+                packages.add(node.module.split(".")[0])
+        _IMPORTS[module_path] = packages
+    return _IMPORTS[module_path]
+
+
+# A directory of the documented project, as listed once by scan_directory.
+# names are all files and folders in it, sub_dirs and modules the paths of the folders and python modules which are not
+# excluded, and children the models of the sub directories which are not skipped, by their path. All are sorted by name.
+SourceDirectory = namedtuple(
+    "SourceDirectory", ["path", "names", "sub_dirs", "modules", "children"]
+)
+
+
+def scan_directory(directory, excluded_dirs=(), excluded_modules=(), skipped_dirs=()):
+    """Return the model of the directory and all directories below it which are not skipped."""
+    with os.scandir(directory) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    names = [entry.name for entry in entries]
+    sub_dirs = [
+        os.path.join(directory, entry.name)
+        for entry in entries
+        if entry.is_dir() and entry.name not in excluded_dirs
+    ]
+    modules = [
+        os.path.join(directory, name)
+        for name in names
+        if name[-3:] == ".py" and name[:-3] not in excluded_modules
+    ]
+    children = {
+        sub_dir: scan_directory(sub_dir, excluded_dirs, excluded_modules, skipped_dirs)
+        for sub_dir in sub_dirs
+        if sub_dir not in skipped_dirs
+    }
+    return SourceDirectory(directory, names, sub_dirs, modules, children)
+
+
+def add_module(source_dir, module_path):
+    # Used for modules which are generated for the directory while generating the documentation
+    name = os.path.basename(module_path)
+    if name not in source_dir.names:
+        bisect.insort(source_dir.names, name)
+    if module_path not in source_dir.modules:
+        bisect.insort(source_dir.modules, module_path)
@@ -0,0 +1,197 @@
+# This file is used by generate_src_rst_files.py to keep the generated content in memory
+# All stages read and write the files of the tree, which is written to disk once at the end
+
+import os
+import build_stats
+
+
+class OutputTree:
+    """Files and folders below root, kept in memory until flush is called.
+
+    Paths are given as for the os functions, relative to the current directory or absolute.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.files = dict()
+        # The names of the files and folders in every folder
+        self.dirs = {self.root: set()}
+
+    def _key(self, path):
+        key = os.path.abspath(path)
+        if key != self.root and not key.startswith(self.root + os.sep):
+            raise ValueError("{} is outside of {}".format(path, self.root))
+        return key
+
+    def _parent(self, key):
+        parent, name = os.path.split(key)
+        if parent not in self.dirs:
+            raise FileNotFoundError("No such directory: {}".format(parent))
+        return parent, name
+
+    def exists(self, path):
+        key = self._key(path)
+        return key in self.files or key in self.dirs
+
+    def listdir(self, path):
+        key = self._key(path)
+        if key not in self.dirs:
+            raise FileNotFoundError("No such directory: {}".format(path))
+        return sorted(self.dirs[key])
+
+    def makedirs(self, path):
+        key = self._key(path)
+        missing = []
+        while key not in self.dirs:
+            if key in self.files:
+                raise FileExistsError("{} is a file".format(key))
+            missing.append(key)
+            key = os.path.dirname(key)
+        for key in reversed(missing):
+            parent, name = os.path.split(key)
+            self.dirs[parent].add(name)
+            self.dirs[key] = set()
+
+    def read(self, path):
+        key = self._key(path)
+        if key not in self.files:
+            raise FileNotFoundError("No such file: {}".format(path))
+        content = self.files[key]
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+            self.files[key] = content
+        return content
+
+    def readlines(self, path):
+        # Like the readlines of a file, lines only end at "\n" and keep it
+        lines = [line + "\n" for line in self.read(path).split("\n")]
+        lines[-1] = lines[-1][:-1]
+        if not lines[-1]:
+            lines.pop()
+        return lines
+
+    def write(self, path, content):
+        key = self._key(path)
+        if key in self.dirs:
+            raise IsADirectoryError("{} is a directory".format(path))
+        parent, name = self._parent(key)
+        self.dirs[parent].add(name)
+        self.files[key] = content
+
+    def append(self, path, content):
+        key = self._key(path)
+        if key in self.files:
+            content = self.read(path) + content
+        self.write(path, content)
+
+    def remove(self, path):
+        key = self._key(path)
+        if key not in self.files:
+            raise FileNotFoundError("No such file: {}".format(path))
+        del self.files[key]
+        parent, name = os.path.split(key)
+        self.dirs[parent].discard(name)
+
+    def _walk(self, key):
+        # The folder and all files and folders below it
+        yield key
+        for name in self.dirs[key]:
+            child = os.path.join(key, name)
+            if child in self.dirs:
+                yield from self._walk(child)
+            else:
+                yield child
+
+    def rmtree(self, path):
+        key = self._key(path)
+        if key not in self.dirs or key == self.root:
+            raise FileNotFoundError("No such directory: {}".format(path))
+        for child in list(self._walk(key)):
+            self.dirs.pop(child, None)
+            self.files.pop(child, None)
+        parent, name = os.path.split(key)
+        self.dirs[parent].discard(name)
+
+    def subtree(self, paths):
+        # A tree with the same root, holding the files and folders at the given paths and everything below them
+        tree = OutputTree(self.root)
+        tree.update(self, paths)
+        return tree
+
+    def update(self, tree, paths):
+        # Replaces the files and folders at the given paths with the ones of another tree with the same root
+        for path in paths:
+            key = self._key(path)
+            if key in self.dirs:
+                self.rmtree(key)
+            elif key in self.files:
+                self.remove(key)
+            if key in tree.dirs:
+                for child in tree._walk(key):
+                    if child in tree.dirs:
+                        self.makedirs(child)
+                    else:
+                        self.write(child, tree.files[child])
+            elif key in tree.files:
+                self.makedirs(os.path.dirname(key))
+                self.write(key, tree.files[key])
+
+    def copy_from_disk(self, src, dst):
+        # Adds all files below the folder src on disk to the folder dst of the tree
+        self.makedirs(dst)
+        for directory, _, files in os.walk(src):
+            target_dir = os.path.join(dst, os.path.relpath(directory, src))
+            self.makedirs(target_dir)
+            for item in files:
+                with open(os.path.join(directory, item), "rb") as f:
+                    content = f.read()
+                build_stats.record_read(len(content))
+                self.write(os.path.join(target_dir, item), content)
+
+    def flush(self, directory=None):
+        """Write the tree to disk, below its root or below directory when it is given,
+        leaving files with unchanged content untouched.
+
+        Files and folders on disk which are not part of the tree are removed.
+        Returns the number of written, unchanged and removed files.
+        """
+        target_root = self.root if directory is None else os.path.abspath(directory)
+
+        def target(key):
+            return target_root + key[len(self.root) :]
+
+        files = set(target(key) for key in self.files)
+        dirs = set(target(key) for key in self.dirs)
+        num_written, num_unchanged, num_removed = 0, 0, 0
+        for directory, sub_dirs, file_names in os.walk(target_root, topdown=False):
+            for item in file_names:
+                path = os.path.join(directory, item)
+                if path not in files:
+                    os.remove(path)
+                    num_removed += 1
+            for item in sub_dirs:
+                path = os.path.join(directory, item)
+                if path not in dirs:
+                    if os.path.islink(path):
+                        os.remove(path)
+                    else:
+                        os.rmdir(path)
+        for path in sorted(dirs):
+            os.makedirs(path, exist_ok=True)
+        for key, content in self.files.items():
+            path = target(key)
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+            if os.path.isfile(path) and os.path.getsize(path) == len(content):
+                build_stats.record_read(len(content))
+                with open(path, "rb") as f:
+                    if f.read() == content:
+                        num_unchanged += 1
+                        continue
+            # the file is replaced instead of written to, it may be a link to the stored copy of an asset
+            with open(path + ".tmp", "wb") as f:
+                f.write(content)
+            os.replace(path + ".tmp", path)
+            build_stats.record_write(len(content))
+            num_written += 1
+        return num_written, num_unchanged, num_removed
@@ -11,10 +11,29 @@
 # documentation root, use os.path.abspath to make it absolute, like shown here.
 #
 import os
+import json
 import sys
+import importlib.abc
+import importlib.util
 sys.path.insert(0, os.path.abspath('../..'))
 
 
+# Modules generated while building the documentation, such as the array and container methods of ivy,
+# are imported from the _stubs folder instead of being written into the documented repository.
+_stubs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_stubs')
+
+
+class _StubFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self, fullname, path, target=None):
+        stub_path = os.path.join(_stubs_dir, *fullname.split('.')) + '.py'
+        if os.path.isfile(stub_path):
+            return importlib.util.spec_from_file_location(fullname, stub_path)
+        return None
+
+
+sys.meta_path.insert(0, _StubFinder())
+
+
 # -- Project information -----------------------------------------------------
 
 project = 'Ivy'
@@ -39,6 +58,10 @@ extensions = ['sphinx.ext.autodoc',
               'sphinx.ext.napoleon',
               'sphinx_autodoc_typehints']
 
+# The parallel checks and measurements of builds run through sphinx-build.py, which has imported the extension
+if 'build_events' in sys.modules:
+    extensions.append('build_events')
+
 # Add any paths that contain templates here, relative to this directory.
 templates_path = ['_templates']
 
@@ -66,6 +89,20 @@ html_css_files = [
 
 autodoc_member_order = 'alphabetical'
 
+# Packages which autodoc mocks instead of importing them, filled in by generate_src_rst_files.py --mock_imports
+autodoc_mock_imports = []
+
+# Signatures of the documented functions and classes, found without importing them by generate_src_rst_files.py
+# --mock_imports, and used for the objects of which autodoc cannot find the signature itself
+_signatures_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_signatures.json')
+_signatures = dict()
+
+
+def _add_cached_signature(app, what, name, obj, options, signature, return_annotation):
+    if not signature and name in _signatures:
+        return tuple(_signatures[name])
+    return None
+
 suppress_warnings = []
 
 # Napoleon settings
@@ -106,3 +143,10 @@ typehints_use_rtype = True
 typehints_defaults = 'braces-after'
 simplify_optional_unions = False
 typehints_formatter = None
+
+
+def setup(app):
+    if os.path.isfile(_signatures_path):
+        with open(_signatures_path) as f:
+            _signatures.update(json.load(f))
+        app.connect('autodoc-process-signature', _add_cached_signature)
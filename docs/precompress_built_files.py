@@ -0,0 +1,297 @@
+# This file is the last, optional stage of the documentation building pipeline
+# It minifies the html, css and js files of the build folder and writes a gzip and a brotli compressed copy next to
+# every text file, e.g. index.html.gz and index.html.br, which static hosts serve instead of compressing the files
+# for every request. Files with the same content as after their last compression are skipped.
+
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import hashlib
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import build_stats
+from correct_built_html_files import (
+    CORRECTED_PAGES_MANIFEST,
+    hash_file,
+    shard_html_files,
+)
+
+try:
+    import brotli
+except ImportError as e:
+    logging.warning(
+        "brotli could not be imported, only gzip compressed files are written, {}".format(e)
+    )
+    brotli = None
+
+# Content hashes of the files after their last compression, with the compressed copies written for them
+COMPRESSED_FILES_MANIFEST = ".compressed_files.json"
+
+# Files which are compressed, and the ones of them which are minified
+COMPRESSED_EXTENSIONS = [".html", ".css", ".js", ".svg", ".json", ".txt", ".xml"]
+MINIFIED_EXTENSIONS = [".html", ".css", ".js"]
+
+# Smaller files are not compressed, the compressed copy would hardly be smaller
+MIN_COMPRESSED_SIZE = 256
+
+# The compressed copies are written once per change, so they are compressed as much as possible, except that the
+# highest brotli quality takes seconds per megabyte for a few percent smaller files
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 10
+
+# Elements of which the whitespace is kept as it is
+PRESERVED_ELEMENTS_RE = re.compile(
+    r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.S | re.I
+)
+HTML_COMMENT_RE = re.compile(r"<!--(?!\[if|<!|>).*?-->", re.S)
+INDENTATION_RE = re.compile(r"[ \t]*\n\s*")
+
+# Strings and comments of style sheets, and whitespace around the characters which do not need it
+CSS_TOKEN_RE = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')|/\*.*?\*/", re.S)
+CSS_SPACE_RE = re.compile(r"\s*([{};,])\s*")
+
+
+def minify_html(html_contents):
+    # The indentation and line breaks between elements are collapsed to a single line break, and comments removed,
+    # except in elements where whitespace is displayed or significant
+    pieces = PRESERVED_ELEMENTS_RE.split(html_contents)
+    minified = []
+    # every match adds the element and the name of its tag to the pieces
+    for index in range(0, len(pieces), 3):
+        text = HTML_COMMENT_RE.sub("", pieces[index])
+        minified.append(INDENTATION_RE.sub("\n", text))
+        if index + 1 < len(pieces):
+            minified.append(pieces[index + 1])
+    return "".join(minified).strip() + "\n"
+
+
+def minify_css(css_contents):
+    pieces = []
+    # the code around a dropped comment is minified as one piece
+    code = ""
+    start = 0
+    for match in CSS_TOKEN_RE.finditer(css_contents):
+        code += css_contents[start : match.start()]
+        if match.group(1):
+            # strings are kept, comments dropped
+            pieces.append(_minify_css_code(code))
+            pieces.append(match.group(1))
+            code = ""
+        start = match.end()
+    pieces.append(_minify_css_code(code + css_contents[start:]))
+    return "".join(pieces).strip() + "\n"
+
+
+def _minify_css_code(code):
+    return CSS_SPACE_RE.sub(r"\1", re.sub(r"\s+", " ", code)).replace(";}", "}")
+
+
+def minify_js(js_contents):
+    # Only the empty lines are removed, the indentation of a line may be part of a string continued with a backslash.
+    # Scripts with template literals are kept as they are, their empty lines may be part of the literal
+    if "`" in js_contents:
+        return js_contents
+    return "\n".join(line for line in js_contents.split("\n") if line.strip()) + "\n"
+
+
+def minify(file_path, contents):
+    extension = os.path.splitext(file_path)[1]
+    if extension == ".html":
+        return minify_html(contents)
+    if extension == ".css":
+        return minify_css(contents)
+    if extension == ".js" and not file_path.endswith(".min.js"):
+        return minify_js(contents)
+    return contents
+
+
+def list_compressed_files(directory):
+    file_paths = []
+    for dirpath, sub_dirs, files in os.walk(directory):
+        sub_dirs.sort()
+        for item in sorted(files):
+            # the manifests of the stages are not part of the site
+            if item[0] != "." and os.path.splitext(item)[1] in COMPRESSED_EXTENSIONS:
+                file_paths.append(os.path.join(dirpath, item))
+    return file_paths
+
+
+def write_file(file_path, content):
+    # Replaces the file instead of writing to it, it may be a link to a file of another build
+    with open(file_path + ".tmp", "wb") as f:
+        f.write(content)
+    os.replace(file_path + ".tmp", file_path)
+
+
+def compress_file(file_path, minified):
+    """Minify the file when minified is True, and write its compressed copies.
+
+    Returns the hash of the content before and after minification, the compressed copies written and the number of
+    bytes of the file and of its copies.
+    """
+    with open(file_path, "rb") as f:
+        content = f.read()
+    original_hash = hashlib.sha256(content).hexdigest()
+    if minified and os.path.splitext(file_path)[1] in MINIFIED_EXTENSIONS:
+        minified_content = minify(file_path, content.decode("utf-8")).encode("utf-8")
+        if minified_content != content:
+            content = minified_content
+            write_file(file_path, content)
+    extensions = []
+    num_bytes = len(content)
+    if len(content) >= MIN_COMPRESSED_SIZE:
+        compressed = {".gz": gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)}
+        if brotli is not None:
+            compressed[".br"] = brotli.compress(content, quality=BROTLI_QUALITY)
+        for extension, compressed_content in compressed.items():
+            write_file(file_path + extension, compressed_content)
+            extensions.append(extension)
+            num_bytes += len(compressed_content)
+    return original_hash, hashlib.sha256(content).hexdigest(), extensions, num_bytes
+
+
+def compress_shard(file_paths, minified):
+    # A file which cannot be compressed is recorded and skipped, so the rest of the shard is still compressed
+    start_time = time.perf_counter()
+    results = dict()
+    failures = []
+    num_bytes, num_written_bytes = 0, 0
+    for file_path in file_paths:
+        try:
+            num_bytes += os.path.getsize(file_path)
+            results[file_path] = compress_file(file_path, minified)
+            num_written_bytes += results[file_path][3]
+        except Exception as e:
+            failures.append((file_path, "{}: {}".format(type(e).__name__, e)))
+    elapsed = time.perf_counter() - start_time
+    return os.getpid(), num_bytes, num_written_bytes, elapsed, failures, results
+
+
+def get_compressed_extensions():
+    return [".gz", ".br"] if brotli is not None else [".gz"]
+
+
+def compress_files(directory, jobs=1, minified=False):
+    manifest_path = os.path.join(directory, COMPRESSED_FILES_MANIFEST)
+    compressed_files = dict()
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            compressed_files = json.load(f)
+    # Files compressed with other settings are compressed again
+    settings = [minified, get_compressed_extensions()]
+    if compressed_files.get("settings") != settings:
+        compressed_files = {"settings": settings, "files": dict()}
+
+    # Files with the same content as after their last compression, which still have their compressed copies
+    all_file_paths = list_compressed_files(directory)
+    file_paths = []
+    for file_path in all_file_paths:
+        entry = compressed_files["files"].get(os.path.relpath(file_path, directory))
+        if (
+            entry is None
+            or any(not os.path.exists(file_path + extension) for extension in entry[1])
+            or hash_file(file_path) != entry[0]
+        ):
+            file_paths.append(file_path)
+    print(
+        "{} files unchanged since their last compression".format(
+            len(all_file_paths) - len(file_paths)
+        )
+    )
+
+    if jobs <= 1:
+        results = [compress_shard(file_paths, minified)]
+    else:
+        shards = shard_html_files(file_paths, jobs)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(
+                executor.map(compress_shard, shards, [minified] * len(shards))
+            )
+
+    failures = []
+    file_results = dict()
+    for pid, num_bytes, num_written_bytes, elapsed, shard_failures, shard_results in results:
+        build_stats.record_read(num_bytes, len(shard_results) + len(shard_failures))
+        build_stats.record_write(num_written_bytes, len(shard_results))
+        print(
+            "worker {}: {} files, {:.1f} MB in {:.2f}s".format(
+                pid, len(shard_results) + len(shard_failures), num_bytes / 1e6, elapsed
+            )
+        )
+        failures += shard_failures
+        file_results.update(shard_results)
+    for file_path, error in failures:
+        print("failed to compress {}: {}".format(file_path, error))
+
+    # Compressed copies of files which no longer exist are removed along with their entries
+    all_files = set(os.path.relpath(path, directory) for path in all_file_paths)
+    for relpath, (_, extensions) in list(compressed_files["files"].items()):
+        if relpath not in all_files:
+            for extension in extensions:
+                if os.path.exists(os.path.join(directory, relpath + extension)):
+                    os.remove(os.path.join(directory, relpath + extension))
+            del compressed_files["files"][relpath]
+    for file_path, (_, content_hash, extensions, _) in file_results.items():
+        compressed_files["files"][os.path.relpath(file_path, directory)] = [
+            content_hash,
+            extensions,
+        ]
+    with open(manifest_path, "w") as f:
+        json.dump(compressed_files, f, indent=1, sort_keys=True)
+
+    # Minified pages are still the corrected pages, which incremental corrections must not correct again
+    corrected_pages_path = os.path.join(directory, CORRECTED_PAGES_MANIFEST)
+    if minified and os.path.exists(corrected_pages_path):
+        with open(corrected_pages_path, "r") as f:
+            corrected_pages = json.load(f)
+        for file_path, (original_hash, content_hash, _, _) in file_results.items():
+            page = os.path.relpath(file_path, directory)
+            if corrected_pages.get(page) == original_hash:
+                corrected_pages[page] = content_hash
+        with open(corrected_pages_path, "w") as f:
+            json.dump(corrected_pages, f, indent=1, sort_keys=True)
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--build_dir",
+        type=str,
+        default="build",
+        help="Folder of the built files.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes compressing the built files, 0 uses all cores.",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Minify the html, css and js files before compressing them.",
+    )
+    parser.add_argument(
+        "--stats",
+        type=str,
+        help="JSON report the time and resources of the compression are added to.",
+    )
+    parsed_args = parser.parse_args()
+    if parsed_args.stats:
+        build_stats.start(parsed_args.stats, "precompress_built_files")
+
+    with build_stats.measure("compress_files"):
+        failures = compress_files(
+            parsed_args.build_dir,
+            parsed_args.jobs or os.cpu_count(),
+            parsed_args.minify,
+        )
+    if failures:
+        print("\nFailed to compress {} built files\n".format(len(failures)))
+        sys.exit(1)
+    print("\nCompressed built files\n")
@@ -8,11 +8,19 @@ rm -rf make.bat
 rm -rf _make_docs.sh
 rm -rf Makefile
 rm -rf sphinx-build.py
+rm -rf build_events.py
 rm -rf build/array/array_methods
 rm -rf build/container/container_methods
-rm -rf ../ivy/array/array_methods.py
-rm -rf ../ivy/container/container_methods.py
+rm -rf build_only/array/array_methods
+rm -rf build_only/container/container_methods
 rm -rf supported_devices.py
+rm -rf module_scanner.py
+rm -rf output_tree.py
+rm -rf build_stats.py
+rm -rf install_requirements.sh
+rm -rf build_ivy_modules.py
+rm -rf asset_store.py
+rm -rf precompress_built_files.py
 cd partial_source || exit
 rm -rf _static
 cd images || exit
@@ -1,7 +1,14 @@
 import re
 import sys
+import build_events
+import build_stats
 from sphinx.cmd.build import main
 
 if __name__ == '__main__':
     sys.argv[0] = re.sub(r'(-script\.pyw|\.exe)?$', '', sys.argv[0])
-    sys.exit(main())
+    if "--stats" in sys.argv:
+        # the JSON report the time and resources of the build are added to, not an option of sphinx
+        index = sys.argv.index("--stats")
+        build_stats.start(sys.argv[index + 1], "sphinx-build")
+        del sys.argv[index : index + 2]
+    sys.exit(main(sys.argv[1:]))
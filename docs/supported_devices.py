@@ -1,27 +1,335 @@
+import os
 import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+from module_scanner import scan_module, read_module
 
 sys.path.append("..")
 
-import ivy
+# ivy is only imported where the backends are probed, as setting its backends imports all frameworks
+ivy = None
 
+DEVICES = ["cpu", "gpu"]
+BACKENDS = ["jax", "numpy", "tensorflow", "torch"]
 
-def get_flags(fn_name):
-    if 'static' in fn_name:
-        fn_name = '_'.join(fn_name.split('_')[1:])
-    flags = []
-    if fn_name not in ivy.__dict__:
-        return (), False
-    for device in ["cpu", "gpu"]:
-        for backend in ["jax", "numpy", "tensorflow", "torch"]:
-            ivy.set_backend(backend)
+# Packages whose versions decide the support matrix, next to the ivy commit
+BACKEND_PACKAGES = ["jax", "jaxlib", "numpy", "tensorflow", "torch"]
+
+# Flags of every function found so far, ordered by device and then by backend as in the device support table,
+# None for functions which ivy does not have
+SUPPORT_MATRIX = dict()
+SUPPORT_MATRIX_KEY = None
+SUPPORT_MATRIX_CHANGED = False
+
+# Every backend is probed in its own process, so that the frameworks do not share the memory of one process
+# and a backend which fails to import does not affect the others
+PROBE_IN_PROCESSES = True
+FAILED_BACKENDS = list()
+
+# Builds find the flags of the functions they document before the generation, other lookups which are not stored
+# have no flags
+PROBE_ON_MISS = True
+
+
+def import_ivy():
+    global ivy
+    if ivy is None:
+        import ivy as ivy_module
+
+        ivy = ivy_module
+    return ivy
+
+
+def hash_source_files(root_dir):
+    sha256 = hashlib.sha256()
+    for directory, sub_dirs, files in os.walk(root_dir):
+        sub_dirs.sort()
+        for item in sorted(files):
+            if item[-3:] == ".py":
+                path = os.path.join(directory, item)
+                sha256.update(path.encode())
+                sha256.update(read_module(path))
+    return sha256.hexdigest()
+
+
+def get_ivy_version(root_dir):
+    # The commit of ivy, along with the hash of uncommitted changes,
+    # or the hash of all its source files when it is not a git repository
+    try:
+        commit = subprocess.check_output(
+            ["git", "-C", root_dir, "rev-parse", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+        changes = subprocess.check_output(
+            ["git", "-C", root_dir, "diff", "HEAD", "--", "."],
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "source-" + hash_source_files(root_dir)
+    if changes:
+        return commit + "-" + hashlib.sha256(changes).hexdigest()
+    return commit
+
+
+def get_support_matrix_key(root_dir):
+    # Found without importing ivy or any of the frameworks
+    backend_versions = dict()
+    for package in BACKEND_PACKAGES:
+        try:
+            backend_versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            backend_versions[package] = None
+    return {"ivy": get_ivy_version(root_dir), "backends": backend_versions}
+
+
+def load_support_matrix(path, root_dir):
+    # Reuses the flags stored by a previous build when neither ivy nor the installed frameworks changed
+    global SUPPORT_MATRIX, SUPPORT_MATRIX_KEY, SUPPORT_MATRIX_CHANGED
+    SUPPORT_MATRIX_KEY = get_support_matrix_key(root_dir)
+    SUPPORT_MATRIX_CHANGED = False
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            stored = json.load(f)
+        if stored.get("key") == SUPPORT_MATRIX_KEY:
+            SUPPORT_MATRIX = {
+                fn_name: None if flags is None else tuple(flags)
+                for fn_name, flags in stored["flags"].items()
+            }
+            return True
+        logging.info("{} is outdated, device support is found again".format(path))
+    SUPPORT_MATRIX = dict()
+    return False
+
+
+def save_support_matrix(path, root_dir=None):
+    global SUPPORT_MATRIX_KEY, SUPPORT_MATRIX_CHANGED
+    if not SUPPORT_MATRIX_CHANGED and os.path.exists(path):
+        return True
+    if FAILED_BACKENDS:
+        # flags of failed backends are not stored, so that the next build probes them again
+        logging.warning(
+            "{} is not updated, probing {} failed".format(
+                path, ", ".join(FAILED_BACKENDS)
+            )
+        )
+        return False
+    if SUPPORT_MATRIX_KEY is None:
+        SUPPORT_MATRIX_KEY = get_support_matrix_key(root_dir)
+    with open(path + ".tmp", "w") as f:
+        json.dump(
+            {"key": SUPPORT_MATRIX_KEY, "flags": SUPPORT_MATRIX},
+            f,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            sort_keys=True,
+        )
+    os.replace(path + ".tmp", path)
+    SUPPORT_MATRIX_CHANGED = False
+    return True
+
+
+def probe_backend(backend, fn_names=None):
+    # Sets the backend once and finds the unsupported devices of the functions ivy has, all its functions when
+    # fn_names is None, None for functions which are not available with the backend or could not be probed
+    start = time.perf_counter()
+    import_ivy()
+    if fn_names is None:
+        fn_names = [name for name, value in ivy.__dict__.items() if callable(value)]
+    unsupported_devices = dict.fromkeys(
+        fn_name for fn_name in fn_names if fn_name in ivy.__dict__
+    )
+    failed_fn_names = []
+    try:
+        ivy.set_backend(backend)
+    except Exception as e:
+        error = "could not set the backend, {}: {}".format(type(e).__name__, e)
+        return unsupported_devices, failed_fn_names, time.perf_counter() - start, error
+    try:
+        for fn_name in unsupported_devices:
             try:
-                if fn_name not in ivy.__dict__:
-                    flags.append("❌")
-                elif device not in ivy.function_unsupported_devices(ivy.__dict__[fn_name]):
+                unsupported_devices[fn_name] = tuple(
+                    str(device)
+                    for device in ivy.function_unsupported_devices(
+                        ivy.__dict__[fn_name]
+                    )
+                )
+            except Exception:
+                failed_fn_names.append(fn_name)
+    finally:
+        ivy.unset_backend()
+    return unsupported_devices, failed_fn_names, time.perf_counter() - start, None
+
+
+def probe_backends(fn_names):
+    # Returns the unsupported devices of every function for each backend, and reports how long every backend took
+    start = time.perf_counter()
+    results = dict()
+    if PROBE_IN_PROCESSES:
+        # spawned workers start without any framework imported by this process
+        context = multiprocessing.get_context("spawn")
+        executors = {
+            backend: ProcessPoolExecutor(1, mp_context=context) for backend in BACKENDS
+        }
+        futures = {
+            backend: executors[backend].submit(probe_backend, backend, fn_names)
+            for backend in BACKENDS
+        }
+        for backend in BACKENDS:
+            try:
+                results[backend] = futures[backend].result()
+            except Exception as e:
+                error = "the worker process failed, {}: {}".format(type(e).__name__, e)
+                results[backend] = (
+                    dict(),
+                    [],
+                    time.perf_counter() - start,
+                    error,
+                )
+            executors[backend].shutdown()
+    else:
+        for backend in BACKENDS:
+            results[backend] = probe_backend(backend, fn_names)
+
+    unsupported_devices = dict()
+    for backend in BACKENDS:
+        unsupported_devices[backend], failed_fn_names, elapsed, error = results[
+            backend
+        ]
+        if error is not None:
+            FAILED_BACKENDS.append(backend)
+            logging.warning(
+                "Probing the {} backend failed after {:.1f}s, {}".format(
+                    backend, elapsed, error
+                )
+            )
+            continue
+        print(
+            "Probed {} functions with the {} backend in {:.1f}s".format(
+                len(unsupported_devices[backend]), backend, elapsed
+            )
+        )
+        if failed_fn_names:
+            logging.warning(
+                "Unsupported devices of {} functions could not be found with the {} backend: {}{}".format(
+                    len(failed_fn_names),
+                    backend,
+                    ", ".join(failed_fn_names[:10]),
+                    ", ..." if len(failed_fn_names) > 10 else "",
+                )
+            )
+    return unsupported_devices
+
+
+def build_support_matrix(fn_names=None):
+    # Each backend is set only once for all the functions instead of once per function and device, all functions
+    # of ivy are probed when fn_names is None. The functions are looked up in ivy where the backends are probed,
+    # so this process does not import ivy when every backend is probed in its own process
+    global SUPPORT_MATRIX_CHANGED
+    if fn_names is not None:
+        fn_names = [name for name in fn_names if name not in SUPPORT_MATRIX]
+        if not fn_names:
+            return SUPPORT_MATRIX
+    unsupported_devices = probe_backends(fn_names)
+    if fn_names is None:
+        fn_names = sorted(set().union(*unsupported_devices.values()))
+    SUPPORT_MATRIX_CHANGED = True
+    for fn_name in fn_names:
+        # functions which ivy does not have are not probed with any backend
+        if all(fn_name not in unsupported_devices[backend] for backend in BACKENDS):
+            SUPPORT_MATRIX[fn_name] = None
+            continue
+        flags = []
+        for device in DEVICES:
+            for backend in BACKENDS:
+                unsupported = unsupported_devices[backend].get(fn_name)
+                if unsupported is not None and device not in unsupported:
                     flags.append("✅")
                 else:
                     flags.append("❌")
-            except Exception as e:
-                flags.append("❌")
-            ivy.unset_backend()
-    return tuple(flags), True
+        SUPPORT_MATRIX[fn_name] = tuple(flags)
+    return SUPPORT_MATRIX
+
+
+def get_function_name(fn_name):
+    if 'static' in fn_name:
+        fn_name = '_'.join(fn_name.split('_')[1:])
+    return fn_name
+
+
+def get_flags(fn_name):
+    fn_name = get_function_name(fn_name)
+    if fn_name not in SUPPORT_MATRIX:
+        if not PROBE_ON_MISS:
+            return (), False
+        # The first lookup finds the flags of all functions at once
+        if not SUPPORT_MATRIX:
+            build_support_matrix()
+        build_support_matrix([fn_name])
+    flags = SUPPORT_MATRIX[fn_name]
+    if flags is None:
+        return (), False
+    return flags, True
+
+
+def get_documented_function_names(root_dir):
+    # The names of all public functions in the modules of ivy, as looked up while generating the documentation
+    fn_names = set()
+    for directory, sub_dirs, files in os.walk(root_dir):
+        sub_dirs[:] = [
+            item for item in sub_dirs if item not in ["docs", "tests", "__pycache__"]
+        ]
+        for item in files:
+            if item[-3:] == ".py":
+                module_symbols = scan_module(os.path.join(directory, item))
+                fn_names.update(
+                    get_function_name(symbol.name)
+                    for symbol in module_symbols.functions
+                    if symbol.name[0] != "_"
+                )
+    return sorted(fn_names)
+
+
+if __name__ == "__main__":
+    # Computes the support matrix ahead of a documentation build, e.g. when building the docker image
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--root_dir",
+        type=str,
+        required=True,
+        help="Root directory of the repository relaitve to current directory.",
+    )
+    parser.add_argument(
+        "--submodules_title",
+        type=str,
+        help="Not used, accepted for the same arguments as generate_src_rst_files.py.",
+    )
+    parser.add_argument(
+        "--probe_in_process",
+        action="store_true",
+        help="Probe all backends one after another in this process instead of one process per backend.",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=".support_matrix.json",
+        help="File the support matrix is stored in.",
+    )
+    parsed_args = parser.parse_args()
+    PROBE_IN_PROCESSES = not parsed_args.probe_in_process
+    if not load_support_matrix(parsed_args.output, parsed_args.root_dir):
+        build_support_matrix()
+    build_support_matrix(get_documented_function_names(parsed_args.root_dir))
+    if not save_support_matrix(parsed_args.output):
+        sys.exit(1)
+    print(
+        "Device support of {} functions stored in {}".format(
+            sum(flags is not None for flags in SUPPORT_MATRIX.values()),
+            parsed_args.output,
+        )
+    )